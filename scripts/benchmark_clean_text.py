@@ -0,0 +1,66 @@
+"""
+Compare the throughput of cleaning text for language identification done
+three ways:
+
+- Running all of ftfy's fixes and checking the Unicode category of each
+  character in Python, as `clean_text` originally did
+- `clean_text(text)`, which deletes characters with a translation table
+- `clean_text(text, use_ftfy=False)`, which also runs only ftfy's quick
+  fixes
+
+The input is a sample of plain text with one document per line, such as
+comments extracted from Reddit:
+
+    python scripts/benchmark_clean_text.py reddit-sample.txt
+
+The first two are checked to give the same results on every text.
+"""
+import time
+import unicodedata
+from typing import Callable, List
+
+import ftfy
+import typer
+
+from benchmark_sample import read_sample
+from spacious_corpus.lang_id import clean_text
+
+
+def clean_text_per_char(text: str) -> str:
+    """
+    Clean text the way `clean_text` originally did.
+    """
+    cleaned_text = ftfy.fix_text(text, normalization="NFKC").casefold()
+    kept_chars = [ch for ch in cleaned_text if unicodedata.category(ch)[0] in "LMZ"]
+    return " ".join("".join(kept_chars).split())
+
+
+def time_cleaner(cleaner: Callable[[str], str], texts: List[str]) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        cleaner(text)
+    return time.perf_counter() - start
+
+
+def benchmark(filename: str, num_docs: int = 100_000):
+    texts = read_sample(filename, num_docs)
+    for text in texts:
+        if clean_text(text) != clean_text_per_char(text):
+            raise ValueError(f"Cleaned versions of {text!r} differ")
+
+    cleaners = {
+        "per character": clean_text_per_char,
+        "clean_text": clean_text,
+        "clean_text without ftfy": lambda text: clean_text(text, use_ftfy=False),
+    }
+    timings = {name: time_cleaner(cleaner, texts) for name, cleaner in cleaners.items()}
+    baseline = timings["per character"]
+    for name, timing in timings.items():
+        print(
+            f"{name}:\t{len(texts) / timing:.0f} texts/s\t"
+            f"speedup: {baseline / timing:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(benchmark)
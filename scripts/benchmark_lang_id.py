@@ -0,0 +1,76 @@
+"""
+Compare the throughput of language identification done three ways:
+
+- Classifying one text at a time and aligning its fastText label to a spaCy
+  language with `langcodes.closest_match` every time, as `detect_language`
+  originally did
+- `LanguageIdentifier.detect_language`, which looks up the label's spaCy
+  language in a table computed when the model is loaded
+- `LanguageIdentifier.detect_languages`, which classifies batches of texts
+
+The input is a sample of plain text with one document per line, such as
+comments extracted from Reddit:
+
+    python scripts/benchmark_lang_id.py reddit-sample.txt
+
+All three are checked to give the same results on every text.
+"""
+import time
+
+import typer
+
+from benchmark_sample import read_sample
+from spacious_corpus.lang_id import (
+    LID_BATCH_SIZE,
+    LanguageIdentifier,
+    align_language_to_spacy,
+    clean_text,
+)
+
+
+def detect_language_uncached(lid: LanguageIdentifier, text: str):
+    """
+    Detect the language of a text, aligning the label to spaCy's languages
+    without any caching.
+    """
+    language_struct, confidence_struct = lid.ft_model.predict(clean_text(text))
+    label_size = len("__label__")
+    language = align_language_to_spacy.__wrapped__(language_struct[0][label_size:])
+    return (language, confidence_struct[0])
+
+
+def benchmark(
+    filename: str, num_docs: int = 100_000, batch_size: int = LID_BATCH_SIZE
+):
+    texts = read_sample(filename, num_docs)
+    lid = LanguageIdentifier()
+
+    start = time.perf_counter()
+    uncached = [detect_language_uncached(lid, text) for text in texts]
+    uncached_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [lid.detect_language(text) for text in texts]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    languages, confidences = lid.detect_languages(texts, batch_size=batch_size)
+    batched_time = time.perf_counter() - start
+
+    batched = list(zip(languages[:, 0], confidences[:, 0]))
+    if not (uncached == single == batched):
+        raise ValueError("The detected languages differ")
+
+    for name, timing in [
+        ("uncached alignment", uncached_time),
+        ("detect_language", single_time),
+        ("detect_languages", batched_time),
+    ]:
+        print(
+            f"{name}:\t{len(texts) / timing:.0f} texts/s\t"
+            f"speedup: {uncached_time / timing:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(benchmark)
@@ -0,0 +1,106 @@
+"""
+Compare the throughput of text normalization on the tokens of a sample of
+text in each language, done three ways:
+
+- Running every step of `normalize_text` on every token, as it was
+  originally implemented
+- Calling `normalize_text(token, lang)`
+- Calling the function from `get_normalizer(lang)`, which has a fast path
+  for ASCII and combines its steps into translation tables
+
+The input is a sample of plain text with one document per line, as for
+`benchmark_tokenize.py`:
+
+    python scripts/benchmark_normalize.py en:en-sample.txt tr:tr-sample.txt ar:ar-sample.txt
+
+All three are checked to give the same results on every token.
+"""
+import time
+import unicodedata
+from typing import Callable, List
+
+import typer
+from ftfy.fixes import uncurl_quotes
+
+from benchmark_sample import read_sample
+from spacious_corpus.language_info import get_language_info
+from spacious_corpus.nlp import (
+    casefold_with_i_dots,
+    cedillas_to_commas,
+    commas_to_cedillas,
+    get_normalizer,
+    make_nlp_stack,
+    normalize_text,
+    remove_marks,
+)
+from spacious_corpus.transliterate import transliterate
+
+
+def read_tokens(lang: str, filename: str, num_docs: int) -> List[str]:
+    nlp = make_nlp_stack(lang)
+    texts = read_sample(filename, num_docs)
+    return [token.text for doc in nlp.pipe(texts) for token in doc]
+
+
+def normalize_all_steps(text: str, lang: str) -> str:
+    """
+    Normalize text by running every step of `normalize_text` in order.
+    """
+    info = get_language_info(lang)
+    text = text.replace("\n", " ").replace("\t", " ").strip()
+    text = unicodedata.normalize(info["normal_form"], text)
+    if info["transliteration"] is not None:
+        text = transliterate(info["transliteration"], text)
+    text = remove_marks(text)
+    if info["dotless_i"]:
+        text = casefold_with_i_dots(text)
+    else:
+        text = text.casefold()
+    if info["diacritics_under"] == "commas":
+        text = cedillas_to_commas(text)
+    elif info["diacritics_under"] == "cedillas":
+        text = commas_to_cedillas(text)
+    return uncurl_quotes(text)
+
+
+def time_normalizer(normalizer: Callable[[str], str], tokens: List[str]) -> float:
+    start = time.perf_counter()
+    for token in tokens:
+        normalizer(token)
+    return time.perf_counter() - start
+
+
+def benchmark(
+    samples: List[str] = typer.Argument(
+        ..., help="Samples to run, given as LANG:FILENAME"
+    ),
+    num_docs: int = 20_000,
+):
+    for sample in samples:
+        lang, filename = sample.split(":", 1)
+        tokens = read_tokens(lang, filename, num_docs)
+        normalizers = {
+            "all steps": lambda token: normalize_all_steps(token, lang),
+            "normalize_text": lambda token: normalize_text(token, lang),
+            "get_normalizer": get_normalizer(lang),
+        }
+        for token in tokens:
+            results = {normalize(token) for normalize in normalizers.values()}
+            if len(results) > 1:
+                raise ValueError(f"Normalizations of {token!r} differ: {results}")
+
+        ascii_fraction = sum(token.isascii() for token in tokens) / len(tokens)
+        timings = {
+            name: time_normalizer(normalize, tokens)
+            for name, normalize in normalizers.items()
+        }
+        baseline = timings["all steps"]
+        results = "\t".join(
+            f"{name}: {len(tokens) / timing:.0f} tokens/s ({baseline / timing:.2f}x)"
+            for name, timing in timings.items()
+        )
+        print(f"{lang}\t{len(tokens)} tokens ({ascii_fraction:.0%} ASCII)\t{results}")
+
+
+if __name__ == "__main__":
+    typer.run(benchmark)
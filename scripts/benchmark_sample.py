@@ -0,0 +1,16 @@
+"""
+Read the samples of text that the benchmarks in this directory run on. A
+sample is a file of plain text with one document per line.
+"""
+import itertools
+from typing import List
+
+
+def read_sample(filename: str, num_docs: int) -> List[str]:
+    """
+    Read the first `num_docs` non-blank lines of a sample, stripped of
+    surrounding whitespace.
+    """
+    with open(filename, encoding="utf-8") as infile:
+        lines = (line.strip() for line in infile)
+        return list(itertools.islice((line for line in lines if line), num_docs))
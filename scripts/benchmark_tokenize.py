@@ -0,0 +1,63 @@
+"""
+Compare the throughput of tokenizing documents one at a time with `nlp(text)`
+against tokenizing them in batches with `nlp.pipe`, as DocZip.write_stream
+does.
+
+The input is a sample of plain text with one document per line, such as the
+first lines of `wiki2text` output for each language:
+
+    python scripts/benchmark_tokenize.py en:en-sample.txt ja:ja-sample.txt th:th-sample.txt
+
+Japanese requires sudachipy and Thai requires pythainlp to be installed.
+"""
+import time
+from typing import List
+
+import typer
+
+from benchmark_sample import read_sample
+from spacious_corpus.nlp import make_nlp_stack
+
+
+def time_per_doc(nlp, texts: List[str]) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        nlp(text)
+    return time.perf_counter() - start
+
+
+def time_pipe(nlp, texts: List[str], batch_size: int) -> float:
+    start = time.perf_counter()
+    for _doc in nlp.pipe(texts, batch_size=batch_size):
+        pass
+    return time.perf_counter() - start
+
+
+def benchmark(
+    samples: List[str] = typer.Argument(
+        ..., help="Samples to run, given as LANG:FILENAME"
+    ),
+    num_docs: int = 20_000,
+    batch_size: int = 1000,
+):
+    for sample in samples:
+        lang, filename = sample.split(":", 1)
+        texts = read_sample(filename, num_docs)
+        nlp = make_nlp_stack(lang)
+
+        # Warm up the tokenizer cache and any lazily-loaded dictionaries, so
+        # that neither measurement pays for them
+        time_per_doc(nlp, texts[:100])
+
+        per_doc = time_per_doc(nlp, texts)
+        piped = time_pipe(nlp, texts, batch_size)
+        print(
+            f"{lang}\t{len(texts)} docs\t"
+            f"nlp(): {len(texts) / per_doc:.0f} docs/s\t"
+            f"nlp.pipe(): {len(texts) / piped:.0f} docs/s\t"
+            f"speedup: {per_doc / piped:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(benchmark)
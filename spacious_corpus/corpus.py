@@ -31,7 +31,8 @@ def corpus_reader(
     lang: str,
     workdir: Union[Path, str],
     start_at: Optional[int] = None,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    prefetch: int = 0,
 ) -> Callable[[Language], Iterable[Doc]]:
     """
     Run the Snakemake build to acquire a corpus if necessary, then iterate
@@ -39,6 +40,9 @@ def corpus_reader(
 
     The corpus will be looked up in the Snakemake working directory `workdir`,
     or built in that directory if necessary.
+
+    If `prefetch` is positive, that many chunks of the corpus are read and
+    decoded in a background thread while the current chunk is being used.
     """
     workdir = Path(workdir)
 
@@ -50,13 +54,15 @@ def corpus_reader(
 
     absolute_corpus_path = workdir / corpus_subpath
     def corpus_iterator(nlp: Language) -> Iterator[Doc]:
-        corpus = DocZip.open(absolute_corpus_path, nlp.lang)
-        if limit is not None:
-            if start_at is not None:
-                corpus = itertools.islice(corpus, start_at, start_at + limit)
-            else:
-                corpus = itertools.islice(corpus, limit)
-        return corpus
+        # Keep the DocZip open, so that its chunks are read from one open
+        # .zip file into one shared Vocab
+        with DocZip.open(absolute_corpus_path, nlp.lang) as corpus:
+            # iterate_from uses the DocZip's manifest to skip directly to the
+            # chunk containing `start_at`
+            docs = corpus.iterate_from(start_at or 0, prefetch=prefetch)
+            if limit is not None:
+                docs = itertools.islice(docs, limit)
+            yield from docs
     
     return corpus_iterator
 
@@ -66,12 +72,13 @@ def iterate_corpus(
     lang: str,
     workdir: Union[Path, str],
     start_at: Optional[int] = None,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    prefetch: int = 0,
 ) -> Iterator[Doc]:
     """
     Provides a way to access the documents of a particular corpus from outside
     of a spaCy pipeline. Returns an iterator of Doc objects.
     """
     nlp = spacy.blank(lang)
-    reader = corpus_reader(corpus_name, lang, workdir, start_at, limit)
+    reader = corpus_reader(corpus_name, lang, workdir, start_at, limit, prefetch)
     return reader(nlp)
@@ -234,6 +234,28 @@ SOURCE_LANGUAGES = {
         # based on Caswell et al. (2021), https://arxiv.org/pdf/2103.12028.pdf
     ],
 
+    # Comments from a sample of monthly Reddit dumps. Besides English, we
+    # include languages that have at least 5 subreddits in
+    # `reddit.SUBREDDIT_LANGUAGES`, because comments in other languages are
+    # only kept when they're in a subreddit for that language.
+    'reddit': [
+        'cs',
+        'da',
+        'de',
+        'en',
+        'es',
+        'fr',
+        'it',
+        'ja',
+        'nl',
+        'pt',
+        'ro',
+        'ru',
+        'sv',
+        'tr',
+        'uk',
+    ],
+
     # Sufficiently large, non-spammy Wikipedias.
     # See https://meta.wikimedia.org/wiki/List_of_Wikipedias -- we're looking
     # for Wikipedias that have at least 100,000 articles and a "depth" measure
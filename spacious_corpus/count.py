@@ -1,63 +1,282 @@
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from spacy.attrs import ORTH
+from spacy.strings import StringStore
+from spacy.tokens import Doc
+from .countfile import BinaryCounts, is_binary_counts, write_counts
 from .storage import DocZip
-from .tokens import normalize_token
+from .tokens import get_token_normalizer
+from .util import imap_ordered
+import itertools
+import numpy as np
+import os
 import spacy
 import typer
 
+# How many tokens to collect before counting their distinct forms
+COUNT_BATCH_TOKENS = 1_000_000
 
-def count_tokens(lang: str, in_filename: str, out_filename: str):
+# How many rows of external counts to tokenize at once when recounting them
+RECOUNT_BATCH_SIZE = 100_000
+
+
+def _count_orths(
+    orths: np.ndarray,
+    strings: StringStore,
+    normalize: Callable[[str], str],
+    counts: Counter,
+) -> int:
+    """
+    Count an array of ORTH hashes, and add the counts to `counts` under the
+    normalized form of each token. Returns the number of tokens counted.
+
+    Each distinct hash is looked up and normalized only once. The distinct
+    forms are visited in order of their first appearance, so the keys are
+    added to `counts` in the same order as if we counted token by token.
+    """
+    forms, first_indices, form_counts = np.unique(
+        orths, return_index=True, return_counts=True
+    )
+    order = np.argsort(first_indices)
+    total = 0
+    for orth, count in zip(forms[order].tolist(), form_counts[order].tolist()):
+        tok = normalize(strings[orth])
+        if tok != "":
+            counts[tok] += count
+            total += count
+    return total
+
+
+def _count_docs(docs: Iterable[Doc], lang: str, counts: Counter) -> int:
+    """
+    Add the normalized tokens of the given documents to `counts`, and return
+    the number of tokens that were counted.
+
+    The tokens are collected as arrays of ORTH hashes, which are counted in
+    batches of about `COUNT_BATCH_TOKENS`, so that the per-token work happens
+    in NumPy and only the distinct forms need Python-level work.
+    """
+    normalize = get_token_normalizer(lang)
+    total = 0
+    batch = []
+    batch_tokens = 0
+    vocab = None
+    for doc in docs:
+        # The hashes can only be looked up in the Vocab they came from
+        full = batch_tokens >= COUNT_BATCH_TOKENS
+        if batch and (full or doc.vocab is not vocab):
+            orths = np.concatenate(batch)
+            total += _count_orths(orths, vocab.strings, normalize, counts)
+            batch = []
+            batch_tokens = 0
+        vocab = doc.vocab
+        doc_orths = doc.to_array(ORTH)
+        batch.append(doc_orths)
+        batch_tokens += len(doc_orths)
+    if batch:
+        orths = np.concatenate(batch)
+        total += _count_orths(orths, vocab.strings, normalize, counts)
+    return total
+
+
+def _count_chunk(lang: str, in_filename: str, chunkname: str) -> Tuple[Counter, int]:
+    """
+    Count the tokens in one chunk of a DocZip.
+    """
+    counts = Counter()
+    with DocZip.open(in_filename, lang) as doc_store:
+        total = _count_docs(doc_store.iterate_chunk(chunkname), lang, counts)
+    return counts, total
+
+
+def count_tokens(
+    lang: str,
+    in_filename: str,
+    out_filename: str,
+    workers: int = 1,
+    sort_by_token: bool = False,
+    binary: bool = False,
+):
     """
     Take in a file containing a DocZip of tokenized documents, count its tokens,
     and write the ones with a count of at least 2 to a tabular text file.
+
+    The file is in descending order of count, unless `sort_by_token` is True,
+    in which case it's in the order of the tokens. If `binary` is True, it's
+    written in the binary count format instead (see `countfile`).
+
+    If `workers` is more than 1, the chunks of the DocZip are counted in that
+    many worker processes. Their counts are merged in chunk order, so the
+    output is the same as counting serially.
     """
-    doc_store = DocZip.open(in_filename, lang)
     counts = Counter()
     total = 0
-    for doc in doc_store:
-        toks = [normalize_token(tok.text, lang) for tok in doc]
-        toks = [tok for tok in toks if tok != ""]
-        counts.update(toks)
-        total += len(toks)
+    if workers > 1:
+        chunknames = DocZip.open(in_filename, lang).get_chunks()
+        count_chunk = partial(_count_chunk, lang, in_filename)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_counts, chunk_total in imap_ordered(
+                executor, count_chunk, chunknames, max_pending=workers * 2
+            ):
+                counts.update(chunk_counts)
+                total += chunk_total
+    else:
+        with DocZip.open(in_filename, lang) as doc_store:
+            # Decode the next chunk in the background while counting this one
+            total = _count_docs(doc_store.iterate(prefetch=1), lang, counts)
 
     # adjusted_counts drops the items that only occurred once
     one_each = Counter(counts.keys())
     adjusted_counts = counts - one_each
 
     # Write the counted tokens to outfile
-    with open(out_filename, "w", encoding="utf-8") as outfile:
-        print("__total__\t{}".format(total), file=outfile)
-        for token, adjcount in adjusted_counts.most_common():
-            print("{}\t{}".format(token, adjcount + 1), file=outfile)
+    output_counts = (
+        (token, adjcount + 1) for token, adjcount in adjusted_counts.most_common()
+    )
+    write_counts(
+        out_filename, total, output_counts, sort_by_token=sort_by_token, binary=binary
+    )
 
 
 def count_main():
     typer.run(count_tokens)
 
 
-def recount_messy(lang: str, in_filename: str, out_filename: str):
+def _messy_shards(in_filename: str, num_shards: int) -> List[Tuple[int, int]]:
     """
-    Take in a file of counts from another source (such as Google Books), and
-    make it consistent with our tokenization and format.
+    Divide an input file for `recount_messy` into `num_shards` ranges. The
+    ranges are byte offsets in a text file, or token indices in a binary
+    count file.
+    """
+    if is_binary_counts(in_filename):
+        size = len(BinaryCounts(in_filename))
+    else:
+        size = os.path.getsize(in_filename)
+    bounds = [size * shard // num_shards for shard in range(num_shards + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _read_messy_counts(
+    in_filename: str, start: int = 0, end: Optional[int] = None
+) -> Iterator[Tuple[str, int]]:
+    """
+    Read (text, count) pairs from a tab-separated file of counts that may or
+    may not have a __total__ line, or from a binary count file.
+
+    `start` and `end` select a range of the file, as returned by
+    `_messy_shards`. In a text file, this reads the lines that start within
+    that range of bytes.
+    """
+    if is_binary_counts(in_filename):
+        yield from BinaryCounts(in_filename).iterate(start=start, end=end)
+        return
+    with open(in_filename, "rb") as infile:
+        if start > 0:
+            # Skip to the first line that starts at or after `start`
+            infile.seek(start - 1)
+            infile.readline()
+        while end is None or infile.tell() < end:
+            line = infile.readline()
+            if not line:
+                break
+            line = line.decode("utf-8").rstrip()
+            if line and not line.startswith("__total__"):
+                text, strcount = line.split("\t", 1)
+                yield text, int(strcount)
+
+
+def _recount_rows(
+    lang: str, rows: Iterable[Tuple[str, int]], batch_size: int
+) -> Tuple[Counter, int]:
+    """
+    Tokenize and normalize the texts in (text, count) pairs, returning the
+    counts of the resulting tokens and their total.
+
+    The rows are handled in batches of `batch_size`. Within a batch, the
+    counts of rows with the same text are combined, so that each distinct
+    text is tokenized once, and the distinct texts are tokenized with
+    `nlp.pipe`. They are kept in order of their first appearance, so tokens
+    are added to the Counter in the same order as going row by row.
     """
     counts = Counter()
     total = 0
     nlp = spacy.blank(lang)
-    for line in open(in_filename, encoding="utf-8"):
-        line = line.rstrip()
-        if line and not line.startswith("__total__"):
-            text, strcount = line.split("\t", 1)
-            count = int(strcount)
-            toks = [normalize_token(tok.text, lang) for tok in nlp(text)]
-            toks = [tok for tok in toks if tok != ""]
-            for tok in toks:
-                counts[tok] += count
-                total += count
+    normalize = get_token_normalizer(lang)
+    rows = iter(rows)
+    while True:
+        text_counts = {}
+        for text, count in itertools.islice(rows, batch_size):
+            text_counts[text] = text_counts.get(text, 0) + count
+        if not text_counts:
+            break
+        docs = nlp.pipe(text_counts, batch_size=1000)
+        for doc, count in zip(docs, text_counts.values()):
+            for tok in doc:
+                normalized = normalize(tok.text)
+                if normalized != "":
+                    counts[normalized] += count
+                    total += count
+    return counts, total
+
+
+def _recount_shard(
+    lang: str, in_filename: str, batch_size: int, shard: Tuple[int, int]
+) -> Tuple[Counter, int]:
+    """
+    Run `_recount_rows` on one range of an input file.
+    """
+    start, end = shard
+    rows = _read_messy_counts(in_filename, start, end)
+    return _recount_rows(lang, rows, batch_size)
+
+
+def recount_messy(
+    lang: str,
+    in_filename: str,
+    out_filename: str,
+    sort_by_token: bool = False,
+    binary: bool = False,
+    workers: int = 1,
+    batch_size: int = RECOUNT_BATCH_SIZE,
+):
+    """
+    Take in a file of counts from another source (such as Google Books), and
+    make it consistent with our tokenization and format.
+
+    `sort_by_token` and `binary` work the same as in `count_tokens`.
+
+    The input is tokenized in batches of `batch_size` lines. If `workers` is
+    more than 1, the input file is split into shards that are recounted in
+    that many worker processes, and their counts are merged in order, so the
+    output is the same as recounting serially.
+    """
+    if workers > 1:
+        counts = Counter()
+        total = 0
+        # Use more shards than workers, so that the work is balanced even if
+        # some shards are slower to tokenize
+        shards = _messy_shards(in_filename, workers * 4)
+        recount_shard = partial(_recount_shard, lang, in_filename, batch_size)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard_counts, shard_total in imap_ordered(
+                executor, recount_shard, shards, max_pending=workers * 2
+            ):
+                counts.update(shard_counts)
+                total += shard_total
+    else:
+        rows = _read_messy_counts(in_filename)
+        counts, total = _recount_rows(lang, rows, batch_size)
 
     # Write the counted tokens to output
-    with open(out_filename, "w", encoding="utf-8") as outfile:
-        print("__total__\t{}".format(total), file=outfile)
-        for token, count in counts.most_common():
-            print("{}\t{}".format(token, count), file=outfile)
+    write_counts(
+        out_filename,
+        total,
+        counts.most_common(),
+        sort_by_token=sort_by_token,
+        binary=binary,
+    )
 
 
 def recount_main():
@@ -0,0 +1,191 @@
+"""
+Reading and writing count files.
+
+A count file is a tab-separated text file where each line contains a token
+and its count. The first line has the special token `__total__`, whose count
+is the total number of tokens that were counted, including tokens that may
+have been left out of the file.
+
+Count files are usually in descending order of count, but they can also be
+written in order of the tokens, comparing them by codepoint (which is the
+same as comparing their UTF-8 bytes, as `LC_ALL=C sort` does). Count files
+in that order can be merged as streams, without loading them into memory.
+
+There is also a binary format for count files, which is always in order of
+the tokens, and which is read by memory-mapping it with NumPy. It contains,
+with all numbers as little-endian uint64s:
+
+- The 8 bytes of `BINARY_MAGIC`
+- A header of the total, the number of tokens, and the length of the string
+  table in bytes
+- The byte offsets where each token starts in the string table, plus the
+  offset of the end of the table
+- The string table: each token in UTF-8, followed by a newline, padded with
+  zero bytes to a multiple of 8 bytes
+- The count of each token
+
+`read_counts` reads either format.
+"""
+from typing import Iterable, Iterator, List, Tuple
+import numpy as np
+
+TOTAL_TOKEN = "__total__"
+
+BINARY_MAGIC = b"SPCOUNT1"
+BINARY_HEADER_SIZE = 4 * 8
+
+
+class BinaryCounts:
+    """
+    A memory-mapped binary count file. `total` is the total count, and
+    `counts` is an array of the counts of the tokens, in order of the tokens.
+    """
+
+    def __init__(self, filename: str):
+        data = np.memmap(filename, dtype=np.uint8, mode="r")
+        if bytes(data[: len(BINARY_MAGIC)]) != BINARY_MAGIC:
+            raise ValueError(f"{filename} is not a binary count file")
+        header = data[len(BINARY_MAGIC) : BINARY_HEADER_SIZE].view("<u8")
+        total, num_tokens, table_size = (int(value) for value in header)
+
+        offsets_end = BINARY_HEADER_SIZE + 8 * (num_tokens + 1)
+        table_end = offsets_end + _padded_size(table_size)
+        self.total = total
+        self.offsets = data[BINARY_HEADER_SIZE:offsets_end].view("<u8")
+        self.string_table = data[offsets_end:table_end]
+        self.counts = data[table_end : table_end + 8 * num_tokens].view("<u8")
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def tokens(self, start: int = 0, end: int = None) -> List[str]:
+        """
+        Decode the tokens from `start` to `end`, or all of them by default.
+        """
+        if end is None:
+            end = len(self)
+        if start >= end:
+            return []
+        table_bytes = self.string_table[self.offsets[start] : self.offsets[end]]
+        # Every token is followed by a newline, so there's an empty string
+        # at the end of the split
+        return table_bytes.tobytes().decode("utf-8").split("\n")[:-1]
+
+    def iterate(
+        self, block_size: int = 65536, start: int = 0, end: int = None
+    ) -> Iterator[Tuple[str, int]]:
+        """
+        Iterate the (token, count) pairs in order, decoding `block_size` of
+        them at a time. `start` and `end` optionally select a range of them.
+        """
+        if end is None:
+            end = len(self)
+        for block_start in range(start, end, block_size):
+            block_end = min(block_start + block_size, end)
+            tokens = self.tokens(block_start, block_end)
+            counts = self.counts[block_start:block_end].tolist()
+            yield from zip(tokens, counts)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        return self.iterate()
+
+
+def _padded_size(size: int) -> int:
+    return (size + 7) // 8 * 8
+
+
+def is_binary_counts(filename: str) -> bool:
+    """
+    Check whether a file is a binary count file.
+    """
+    with open(filename, "rb") as infile:
+        return infile.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def write_binary_counts(
+    filename: str, total: int, counts: Iterable[Tuple[str, int]]
+):
+    """
+    Write a binary count file containing the `total` and the (token, count)
+    pairs in `counts`, which will be sorted by token.
+    """
+    items = sorted(counts)
+    for token, _count in items:
+        if "\n" in token:
+            raise ValueError(f"Tokens can't contain newlines: {token!r}")
+    encoded = [token.encode("utf-8") + b"\n" for token, _count in items]
+    lengths = np.fromiter(
+        (len(token_bytes) for token_bytes in encoded), dtype="<u8", count=len(items)
+    )
+    offsets = np.zeros(len(items) + 1, dtype="<u8")
+    np.cumsum(lengths, out=offsets[1:])
+    table_size = int(offsets[-1])
+    count_array = np.fromiter(
+        (count for _token, count in items), dtype="<u8", count=len(items)
+    )
+    header = np.array([total, len(items), table_size], dtype="<u8")
+
+    with open(filename, "wb") as outfile:
+        outfile.write(BINARY_MAGIC)
+        outfile.write(header.tobytes())
+        outfile.write(offsets.tobytes())
+        for token_bytes in encoded:
+            outfile.write(token_bytes)
+        outfile.write(b"\0" * (_padded_size(table_size) - table_size))
+        outfile.write(count_array.tobytes())
+
+
+def write_counts(
+    filename: str,
+    total: int,
+    counts: Iterable[Tuple[str, int]],
+    sort_by_token: bool = False,
+    binary: bool = False,
+):
+    """
+    Write a count file containing the `total` and the (token, count) pairs
+    in `counts`. If `sort_by_token` is True, the pairs are written in order
+    of their tokens; otherwise, they're written in the order they're given.
+
+    If `binary` is True, the file is written in the binary format, which is
+    always sorted by token.
+    """
+    if binary:
+        write_binary_counts(filename, total, counts)
+        return
+    if sort_by_token:
+        counts = sorted(counts)
+    with open(filename, "w", encoding="utf-8") as outfile:
+        print("{}\t{}".format(TOTAL_TOKEN, total), file=outfile)
+        for token, count in counts:
+            print("{}\t{}".format(token, count), file=outfile)
+
+
+def read_counts(filename: str) -> Tuple[int, Iterator[Tuple[str, int]]]:
+    """
+    Open a count file, returning its total and an iterator over its other
+    (token, count) pairs, in the order they appear in the file.
+
+    The iterator reads the file as it goes, so it doesn't need to fit in
+    memory.
+    """
+    if is_binary_counts(filename):
+        binary_counts = BinaryCounts(filename)
+        return binary_counts.total, iter(binary_counts)
+
+    infile = open(filename, encoding="utf-8")
+    first_line = infile.readline().rstrip()
+    token, strcount = first_line.split("\t", 1)
+    if token != TOTAL_TOKEN:
+        infile.close()
+        raise ValueError(f"{filename} should start with a {TOTAL_TOKEN} line")
+
+    def iterate_rows():
+        with infile:
+            for line in infile:
+                line = line.rstrip()
+                if line:
+                    token, strcount = line.split("\t", 1)
+                    yield token, int(strcount)
+
+    return int(strcount), iterate_rows()
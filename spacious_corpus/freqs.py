@@ -1,15 +1,29 @@
-from collections import defaultdict
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, TextIO, Tuple
 from operator import itemgetter
-import statistics
+from pathlib import Path
+import heapq
+import itertools
+import os
+import subprocess
+import tempfile
+import numpy as np
 import typer
 
+from .countfile import BinaryCounts, is_binary_counts, read_counts
+
 
 def counts_to_freqs(infile: str) -> Dict[str, float]:
     """
     Convert a file containing word counts and a __total__ line to a list of decimal
     frequencies, by dividing each count by the __total__.
+
+    The file can also be a binary count file, which is memory-mapped.
     """
+    if is_binary_counts(infile):
+        binary_counts = BinaryCounts(infile)
+        freqs = binary_counts.counts / binary_counts.total
+        return dict(zip(binary_counts.tokens(), freqs.tolist()))
+
     total = None
     freqs = {}
     for line in open(infile, encoding="utf-8"):
@@ -30,36 +44,47 @@ def merge_freqs(freq_dicts):
     Merge multiple dictionaries of frequencies, representing each word with
     the 'figure skating average' of the word's frequency over all sources,
     meaning that we drop the highest and lowest values and average the rest.
-    """
-    vocab = set()
-    for freq_dict in freq_dicts:
-        vocab.update(freq_dict)
 
-    merged = defaultdict(float)
+    The frequencies are arranged in a matrix with a row for each term and a
+    column for each source, so that the sorting, trimming and averaging are
+    done by NumPy for all terms at once.
+    """
     N = len(freq_dicts)
     if N < 3:
         raise ValueError("Merging frequencies requires at least 3 frequency lists.")
-    for term in vocab:
-        freqs = []
-        for freq_dict in freq_dicts:
-            freq = freq_dict.get(term, 0.0)
-            freqs.append(freq)
 
-        if freqs:
-            freqs.sort()
-            inliers = freqs[1:-1]
-            mean = statistics.mean(inliers)
-            if mean > 0.0:
-                merged[term] = mean
+    vocab_index = {}
+    for freq_dict in freq_dicts:
+        for term in freq_dict:
+            vocab_index.setdefault(term, len(vocab_index))
+    vocab = np.array(list(vocab_index), dtype=object)
+
+    # Terms that don't appear in a source have a frequency of 0 there
+    matrix = np.zeros((len(vocab), N), dtype=np.float64)
+    for col, freq_dict in enumerate(freq_dicts):
+        rows = np.fromiter(
+            (vocab_index[term] for term in freq_dict),
+            dtype=np.int64,
+            count=len(freq_dict),
+        )
+        matrix[rows, col] = np.fromiter(
+            freq_dict.values(), dtype=np.float64, count=len(freq_dict)
+        )
+    del vocab_index
 
-    total = sum(merged.values())
+    matrix.sort(axis=1)
+    means = matrix[:, 1:-1].mean(axis=1)
+    del matrix
+    nonzero = means > 0.0
+    vocab = vocab[nonzero]
+    means = means[nonzero]
 
     # Normalize the merged values so that they add up to 0.99 (based on
     # a rough estimate that 1% of tokens will be out-of-vocabulary in a
     # wordlist of this size).
-    for term in merged:
-        merged[term] = merged[term] / total * 0.99
-    return merged
+    total = means.sum()
+    means = means / total * 0.99
+    return dict(zip(vocab.tolist(), means.tolist()))
 
 
 def _write_frequency_file(freq_dict, outfile):
@@ -70,7 +95,123 @@ def _write_frequency_file(freq_dict, outfile):
         print("{}\t{:.5g}".format(word, freq), file=outfile)
 
 
-def merge_counts_to_freqs(lang: str, inputs: List[str], output: str):
+def _source_freqs(
+    rows: Iterable[Tuple[str, int]], total: int, source_num: int, filename: str
+) -> Iterator[Tuple[str, int, float]]:
+    """
+    Get the (word, source_num, frequency) of each row of a count file, checking
+    that the rows are sorted by token, as a merge of the files needs them to
+    be.
+    """
+    prev_word = None
+    for word, count in rows:
+        if prev_word is not None and word <= prev_word:
+            raise ValueError(
+                f"{filename} is not sorted by token: {word!r} comes after "
+                f"{prev_word!r}. Write it with --sort-by-token to merge it "
+                f"with --streaming."
+            )
+        prev_word = word
+        yield word, source_num, count / total
+
+
+def _merge_sorted_counts(inputs: List[str], means_file: TextIO) -> float:
+    """
+    Merge count files that are sorted by token, and write the 'figure skating
+    average' of each word's frequency (as in `merge_freqs`) to `means_file`,
+    as tab-separated lines of the average and the word. Returns the sum of
+    the averages.
+
+    This is a k-way merge of the files, so only the current line of each file
+    needs to be in memory.
+    """
+    N = len(inputs)
+    if N < 3:
+        raise ValueError("Merging frequencies requires at least 3 frequency lists.")
+    streams = []
+    for source_num, infile in enumerate(inputs):
+        total, rows = read_counts(infile)
+        streams.append(_source_freqs(rows, total, source_num, infile))
+
+    sum_means = 0.0
+    merged = heapq.merge(*streams)
+    for word, group in itertools.groupby(merged, key=itemgetter(0)):
+        freqs = [0.0] * N
+        for _word, source_num, freq in group:
+            freqs[source_num] = freq
+        freqs.sort()
+        mean = sum(freqs[1:-1]) / (N - 2)
+        if mean > 0.0:
+            print("{!r}\t{}".format(mean, word), file=means_file)
+            sum_means += mean
+    return sum_means
+
+
+def merge_sorted_counts_to_freqs(
+    inputs: List[str], output: str, temp_dir: Optional[str] = None
+):
+    """
+    Merge count files that are sorted by token (see `countfile`) into a
+    frequency file, in the same form that `merge_freqs` and
+    `_write_frequency_file` would produce.
+
+    This uses a constant amount of memory, so it can merge vocabularies that
+    are larger than RAM. The merged frequencies go through temporary files in
+    `temp_dir`, and the final ordering by frequency comes from an external
+    `sort`.
+    """
+    with tempfile.TemporaryDirectory(dir=temp_dir) as tmp:
+        means_path = Path(tmp) / "means.txt"
+        freqs_path = Path(tmp) / "freqs.txt"
+        with open(means_path, "w", encoding="utf-8") as means_file:
+            total = _merge_sorted_counts(inputs, means_file)
+
+        # Normalize the merged values so that they add up to 0.99, as in
+        # merge_freqs, dropping the ones that are too small to be written
+        with open(means_path, encoding="utf-8") as means_file, open(
+            freqs_path, "w", encoding="utf-8"
+        ) as freqs_file:
+            for line in means_file:
+                strmean, word = line.rstrip("\n").split("\t", 1)
+                freq = float(strmean) / total * 0.99
+                if freq >= 1e-9:
+                    print("{!r}\t{}".format(freq, word), file=freqs_file)
+        os.remove(means_path)
+
+        # Sort by descending frequency, then descending word, like
+        # _write_frequency_file. In the C locale, words are compared by
+        # their UTF-8 bytes, which is the same as comparing Python strings.
+        sort_command = ["sort", "-t", "\t", "-k1,1gr", "-k2,2r", "-T", tmp]
+        with subprocess.Popen(
+            sort_command + [str(freqs_path)],
+            stdout=subprocess.PIPE,
+            encoding="utf-8",
+            env=dict(os.environ, LC_ALL="C"),
+        ) as sort_process, open(output, "w", encoding="utf-8") as outfile:
+            for line in sort_process.stdout:
+                strfreq, word = line.rstrip("\n").split("\t", 1)
+                print("{}\t{:.5g}".format(word, float(strfreq)), file=outfile)
+        if sort_process.returncode != 0:
+            raise subprocess.CalledProcessError(sort_process.returncode, sort_command)
+
+
+def merge_counts_to_freqs(
+    lang: str,
+    inputs: List[str],
+    output: str,
+    streaming: bool = False,
+    temp_dir: Optional[str] = None,
+):
+    """
+    Merge count files in a language into a frequency file.
+
+    With `streaming`, the count files must be sorted by token, and they're
+    merged with `merge_sorted_counts_to_freqs` instead of in memory.
+    """
+    if streaming:
+        merge_sorted_counts_to_freqs(inputs, output, temp_dir=temp_dir)
+        return
+
     freq_dicts = [counts_to_freqs(infile) for infile in inputs]
     merged = merge_freqs(freq_dicts)
     with open(output, "w", encoding="utf-8") as outfile:
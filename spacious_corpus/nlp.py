@@ -3,19 +3,21 @@ Utilities for doing multilingual NLP.
 
 `normalize_text` puts text in a standard form that includes Unicode
 normalization and case-folding, plus other fixes that are specific to the
-language.
+language. `get_normalizer` gets a function that does the same thing for one
+language, which is faster when normalizing many strings.
 
 `make_nlp_stack` gets a simple spaCy NLP stack that is appropriate to the
 language.
 """
 
-from ftfy.fixes import uncurl_quotes
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
 import re
 import spacy
 import unicodedata
 
 from .language_info import get_language_info
-from .transliterate import transliterate
+from .transliterate import TRANSLITERATION_TABLES
 
 MAX_LINE_LENGTH = 1_000_000
 
@@ -28,6 +30,26 @@ MARK_RE = re.compile(
     "]"
 )
 
+# The curly quotes that ftfy's `uncurl_quotes` straightens, as a translation
+# table. It also replaces "ŉ", which case-folds to "ʼn", with the apostrophe
+# that uncurl_quotes would end up with, so that it can be applied before case
+# folding.
+UNCURL_QUOTES_TABLE = {
+    **{codepoint: "'" for codepoint in [0x2BC, *range(0x2018, 0x201C)]},
+    **{codepoint: '"' for codepoint in range(0x201C, 0x2020)},
+    ord("ŉ"): "'n",
+}
+
+# Translation tables for fixing diacritics under "s" and "t", in upper and
+# lower case. `commas_to_cedillas` and `cedillas_to_commas` do the same for
+# lowercase letters.
+COMMAS_TO_CEDILLAS_TABLE = str.maketrans("ȘșȚț", "ŞşŢţ")
+CEDILLAS_TO_COMMAS_TABLE = str.maketrans("ŞşŢţ", "ȘșȚț")
+DIACRITICS_TABLES = {
+    "cedillas": COMMAS_TO_CEDILLAS_TABLE,
+    "commas": CEDILLAS_TO_COMMAS_TABLE,
+}
+
 
 def make_nlp_stack(lang):
     """
@@ -194,35 +216,112 @@ def normalize_text(text, language):
 
     >>> normalize_text('бағырты', 'az')
     'bağırtı'
+
+
+    ASCII text
+    ----------
+
+    Most tokens in many languages are entirely ASCII, and none of these steps
+    can change ASCII text except for case folding. So ASCII text is just
+    lowercased, which gives the same result much faster:
+
+    >>> normalize_text('Hello', 'en')
+    'hello'
+    >>> normalize_text('KIRMIZI', 'tr')
+    'kırmızı'
     """
-    # NFC or NFKC normalization, as needed for the language
-    info = get_language_info(language)
-    text = text.replace("\n", " ").replace("\t", " ").strip()
-    text = unicodedata.normalize(info["normal_form"], text)
+    return get_normalizer(language)(text)
 
-    # Transliteration of multi-script languages
-    if info["transliteration"] is not None:
-        text = transliterate(info["transliteration"], text)
 
-    # Abjad mark removal
-    text = remove_marks(text)
+def _mark_table() -> Dict[int, None]:
+    """
+    Get a translation table that deletes the characters `remove_marks`
+    removes. They're all in the Hebrew and Arabic blocks.
+    """
+    return {
+        codepoint: None
+        for codepoint in range(0x590, 0x700)
+        if MARK_RE.match(chr(codepoint))
+    }
 
-    # Case folding
-    if info["dotless_i"]:
-        text = casefold_with_i_dots(text)
-    else:
-        text = text.casefold()
 
-    # Fixing of diacritics
-    if info["diacritics_under"] == "commas":
-        text = cedillas_to_commas(text)
-    elif info["diacritics_under"] == "cedillas":
-        text = commas_to_cedillas(text)
+def _combine_tables(tables: List[dict]) -> Dict[int, Optional[str]]:
+    """
+    Combine translation tables into one table that has the same effect as
+    applying each of them in order.
+    """
+    combined = {}
+    for step_num, table in enumerate(tables):
+        for codepoint, replacement in table.items():
+            # A character that was replaced by an earlier table won't be
+            # seen by this one
+            if codepoint in combined:
+                continue
+            if isinstance(replacement, int):
+                replacement = chr(replacement)
+            for later_table in tables[step_num + 1 :]:
+                if replacement is not None:
+                    replacement = replacement.translate(later_table)
+            combined[codepoint] = replacement
+    return combined
+
+
+@lru_cache(maxsize=None)
+def get_normalizer(language) -> Callable[[str], str]:
+    """
+    Get a function that normalizes text in the given language, giving the
+    same results as `normalize_text`:
+
+    >>> normalize = get_normalizer('ro')
+    >>> normalize('ACELAŞI')
+    'același'
 
-    # curly apostrophes become straight
-    text = uncurl_quotes(text)
+    The language's information is looked up once, and only the steps that
+    apply to the language are run. The steps that only replace or delete
+    characters -- transliteration, mark removal, fixing of diacritics, and
+    uncurling quotes -- are combined into one translation table that's
+    applied before case folding, with the diacritics fixed in both cases.
 
-    return text
+    Case folding in languages with a dotless i includes another Unicode
+    normalization, which could combine the characters that the later steps
+    produce. So in those languages, the diacritics and quotes are fixed with
+    a second table after case folding.
+    """
+    info = get_language_info(language)
+    normal_form = info["normal_form"]
+    dotless_i = info["dotless_i"]
+
+    tables = []
+    if info["transliteration"] is not None:
+        tables.append(TRANSLITERATION_TABLES[info["transliteration"]])
+    tables.append(_mark_table())
+    final_tables = []
+    if info["diacritics_under"] is not None:
+        final_tables.append(DIACRITICS_TABLES[info["diacritics_under"]])
+    final_tables.append(UNCURL_QUOTES_TABLE)
+
+    if dotless_i:
+        table = _combine_tables(tables)
+        casefolded_table = _combine_tables(final_tables)
+    else:
+        table = _combine_tables(tables + final_tables)
+
+    def normalize(text: str) -> str:
+        text = text.replace("\n", " ").replace("\t", " ").strip()
+        if text.isascii():
+            # None of the steps can change ASCII text except case folding
+            if dotless_i:
+                text = text.replace("I", "ı")
+            return text.lower()
+
+        text = unicodedata.normalize(normal_form, text)
+        text = text.translate(table)
+        if dotless_i:
+            return casefold_with_i_dots(text).translate(casefolded_table)
+        else:
+            return text.casefold()
+
+    return normalize
 
 
 def remove_marks(text):
@@ -5,6 +5,7 @@ import typer
 from tqdm import tqdm
 from typing import Optional
 
+from .storage import DEFAULT_CHUNK_CHARS
 from .tokens import tokenize_stream
 
 
@@ -30,13 +31,21 @@ def tokenize_oscar(
     cache_dir: Optional[str] = typer.Option(
         None, help="Directory to download OSCAR data into"
     ),
-    chunk_size: int = 100_000,
+    chunk_size: int = 1_000_000,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
     num_lines: int = 1_000_000,
 ):
     cache_path = pathlib.Path(cache_dir)
     cache_path.mkdir(exist_ok=True)
     stream = stream_oscar(lang, num_lines, cache_path)
-    tokenize_stream(lang, stream, output_file, chunk_size=chunk_size, use_ftfy=True)
+    tokenize_stream(
+        lang,
+        stream,
+        output_file,
+        chunk_size=chunk_size,
+        chunk_chars=chunk_chars,
+        use_ftfy=True,
+    )
 
 
 def main():
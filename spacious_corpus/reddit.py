@@ -0,0 +1,711 @@
+"""
+Sort comments from monthly dumps of Reddit by language.
+
+Each dump has one JSON object per line, describing one comment. We keep the
+comments that are long enough and well-received enough, identify their
+languages with fastText, and write their text to a file for each language,
+with one comment per line. These files are gzip-compressed, so they can be
+piped through `gunzip -c` into `spacious-corpus-tokenize`.
+
+A dump has to be decompressed in order, which happens in a background
+thread. Blocks of its lines are filtered, parsed, language-identified and
+compressed in a pool of worker processes, and their output is written in
+the same order as the input. The output for each block is a separate gzip
+member, and a file of concatenated gzip members decompresses to the
+concatenation of their contents.
+"""
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+import bz2
+import contextlib
+import gzip
+import io
+import itertools
+import json
+import lzma
+import re
+import sys
+import time
+import typer
+
+import langcodes
+
+from .corpus_info import SOURCE_LANGUAGES
+from .lang_id import LanguageIdentifier
+from .util import imap_ordered, prefetch_iterator
+
+# How many lines of a dump to handle in each task
+DEFAULT_BLOCK_LINES = 50_000
+
+# Skip comments whose language is detected with a confidence of this or less
+MIN_CONFIDENCE = 0.8
+
+# Comments need a body of at least MIN_LENGTH characters, and a score of at
+# least MIN_SCORE, counting the bonus that comments not in English get
+MIN_LENGTH = 40
+MIN_SCORE = 4
+NON_ENGLISH_SCORE_BONUS = 2
+
+# Skip comments in subreddits whose names contain any of these
+BLOCKED_SUBREDDIT_PARTS = [
+    'jerk',
+    'okbuddy',
+    'gonewild',
+    # the next lines match several COVID-denial subreddits that were banned
+    # in September 2021
+    'newnormal',
+    'new_normal',
+]
+
+# Regexes that find fields in a line of JSON, for `prefilter_line`. Inside a
+# JSON string, a quote is always escaped, so a key followed by a colon can't
+# be matched inside a string.
+#
+# _BODY_RE reads up to MIN_LENGTH - 1 characters or escape sequences of a
+# body, and its group matches the closing quote if the body ends there.
+_BODY_RE = re.compile(
+    rb'"body":\s*"(?:[^"\\]|\\.){0,%d}(")?' % (MIN_LENGTH - 1)
+)
+_QUARANTINED_RE = re.compile(rb'"quarantined":\s*(true|false|null)')
+_SUBREDDIT_RE = re.compile(rb'"subreddit":\s*"([^"\\]*)"')
+_SCORE_RE = re.compile(rb'"score":\s*(-?[0-9]+)')
+
+# The stages of sorting a comment that can reject it, in order, for
+# reporting how many comments each one rejects
+REJECTION_STAGES = [
+    'length',
+    'quarantined',
+    'subreddit',
+    'score',
+    'filter',
+    'language',
+    'language score',
+]
+
+# The language identifier in a worker process, loaded by `_init_worker`
+_worker_lid = None
+
+
+def is_blocked_subreddit(subreddit: str) -> bool:
+    """
+    Check whether a subreddit's comments are kept out of the corpus.
+    """
+    subreddit = subreddit.casefold()
+    return any(part in subreddit for part in BLOCKED_SUBREDDIT_PARTS)
+
+
+def filter_item(item, lang=None):
+    """
+    Check whether a comment in the language `lang` should be part of the
+    corpus.
+
+    If `lang` is None, the comment's score is compared to the lowest score
+    allowed in any language, so this rejects comments that would be rejected
+    in every language, before we know their language.
+    """
+    score = item['score']
+    text = item['body']
+
+    # Posts in English require a score of 4 or more to be part of the corpus.
+    # In other languages, we require a score of 2 or more.
+    if lang != 'en':
+        score += NON_ENGLISH_SCORE_BONUS
+    return (
+        len(text) >= MIN_LENGTH
+        and score >= MIN_SCORE
+        and not is_blocked_subreddit(item['subreddit'])
+        and not item.get('quarantined')
+        and 'i am a bot' not in text.casefold()
+        and "i'm a bot" not in text.casefold()
+    )
+
+
+def prefilter_line(line: bytes) -> Optional[str]:
+    """
+    Check the conditions of `filter_item` that can be checked on a comment's
+    line of JSON without parsing it, from cheapest to most expensive.
+    Returns the name of the stage that rejects the comment, or None if it
+    has to be parsed to tell.
+
+    The fields are found with regexes, which only reject a comment when
+    `filter_item` would certainly reject it too. A field that can't be found
+    this way is left to `filter_item`. If a field is found more than once,
+    such as in a nested object, the comment is only rejected if every
+    occurrence would reject it.
+    """
+    # Every character of the body takes at least one byte or escape sequence
+    # in the JSON, so a body that ends within MIN_LENGTH - 1 of them is too
+    # short
+    body_ends = _BODY_RE.findall(line)
+    if body_ends and all(body_ends):
+        return 'length'
+    quarantined = _QUARANTINED_RE.findall(line)
+    if quarantined and all(value == b'true' for value in quarantined):
+        return 'quarantined'
+    subreddits = _SUBREDDIT_RE.findall(line)
+    if subreddits and all(
+        is_blocked_subreddit(subreddit.decode('utf-8')) for subreddit in subreddits
+    ):
+        return 'subreddit'
+    # No language gets more than NON_ENGLISH_SCORE_BONUS added to its score
+    scores = _SCORE_RE.findall(line)
+    if scores and max(int(score) for score in scores) < (
+        MIN_SCORE - NON_ENGLISH_SCORE_BONUS
+    ):
+        return 'score'
+    return None
+
+
+@lru_cache(maxsize=None)
+def _closest_plausible_language(
+    lang: str, plausible_languages: Tuple[str, ...]
+) -> str:
+    lang_match, _ = langcodes.closest_match(lang, plausible_languages)
+    return lang_match
+
+
+def match_language(lang: str, subreddit: str) -> str:
+    """
+    Match a detected language to the languages that a comment in the given
+    subreddit might plausibly be in: English, plus the subreddit's languages
+    in `SUBREDDIT_LANGUAGES`. Returns 'und' if none of them match.
+    """
+    plausible_languages = ('en',) + tuple(
+        SUBREDDIT_LANGUAGES.get(subreddit.casefold(), ())
+    )
+    return _closest_plausible_language(lang, plausible_languages)
+
+
+def open_dump(filename: str) -> BinaryIO:
+    """
+    Open a Reddit dump as a binary file, decompressing it according to its
+    extension: .gz, .bz2, .xz, or .zst.
+    """
+    suffix = Path(filename).suffix
+    if suffix == '.gz':
+        return gzip.open(filename, 'rb')
+    elif suffix == '.bz2':
+        return bz2.open(filename, 'rb')
+    elif suffix == '.xz':
+        return lzma.open(filename, 'rb')
+    elif suffix == '.zst':
+        import zstandard
+
+        # The dumps are compressed with a larger window than zstandard
+        # accepts by default
+        decompressor = zstandard.ZstdDecompressor(max_window_size=2 ** 31)
+        return io.BufferedReader(decompressor.stream_reader(open(filename, 'rb')))
+    else:
+        return open(filename, 'rb')
+
+
+def read_line_blocks(
+    dump_files: Iterable[str], block_lines: int
+) -> Iterator[List[bytes]]:
+    """
+    Read the lines of each dump in turn, in lists of up to `block_lines` lines.
+    """
+    for filename in dump_files:
+        with open_dump(filename) as lines:
+            while True:
+                block = list(itertools.islice(lines, block_lines))
+                if not block:
+                    break
+                yield block
+
+
+def _init_worker():
+    global _worker_lid
+    # The texts are only cleaned for language identification, and comments
+    # rarely need ftfy's slower fixes
+    _worker_lid = LanguageIdentifier(use_ftfy=False)
+
+
+def _sort_block(
+    languages: FrozenSet[str], lines: List[bytes]
+) -> Tuple[Dict[str, bytes], Counter, Counter]:
+    """
+    Find the comments in a block of lines that belong in the corpus, and
+    return a gzip member of their text for each of the `languages` they're
+    in.
+
+    The comments go through the cheapest filters first, so that fewer of
+    them have to be parsed, and fewer still have to be language-identified.
+    Also returns a Counter of how many lines were read, rejected at each
+    stage, and kept, and a Counter of the seconds spent on each step.
+    """
+    counts = Counter(lines=len(lines))
+    seconds = Counter()
+
+    start = time.perf_counter()
+    candidates = []
+    for line in lines:
+        stage = prefilter_line(line)
+        if stage is None:
+            candidates.append(line)
+        else:
+            counts[stage] += 1
+    seconds['prefilter'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    items = []
+    for line in candidates:
+        item = json.loads(line)
+        if 'body' in item and filter_item(item):
+            items.append(item)
+        else:
+            counts['filter'] += 1
+    seconds['parse'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Identify the languages of the block of comments at once, which is much
+    # faster than one at a time
+    detected, confidences = _worker_lid.detect_languages(
+        item['body'] for item in items
+    )
+    texts = defaultdict(list)
+    for item, lang, confidence in zip(items, detected[:, 0], confidences[:, 0]):
+        lang_match = match_language(lang, item['subreddit'])
+        if confidence <= MIN_CONFIDENCE or lang_match not in languages:
+            counts['language'] += 1
+        elif not filter_item(item, lang_match):
+            counts['language score'] += 1
+        else:
+            counts['kept'] += 1
+            # Put each comment on one line
+            texts[lang_match].append(' '.join(item['body'].split()))
+    seconds['language ID'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    outputs = {
+        lang: gzip.compress('\n'.join(lang_texts).encode('utf-8') + b'\n')
+        for lang, lang_texts in texts.items()
+    }
+    seconds['compress'] = time.perf_counter() - start
+    return outputs, counts, seconds
+
+
+def report_counts(counts: Counter, seconds: Counter):
+    """
+    Report how many comments were rejected at each stage of sorting them,
+    and how much time was spent on each step, to stderr.
+    """
+    num_lines = max(counts['lines'], 1)
+    print(f"Read {counts['lines']} comments", file=sys.stderr)
+    for stage in REJECTION_STAGES:
+        print(
+            f"Rejected by {stage}: {counts[stage]} ({counts[stage] / num_lines:.1%})",
+            file=sys.stderr,
+        )
+    print(f"Kept: {counts['kept']} ({counts['kept'] / num_lines:.1%})", file=sys.stderr)
+    for step, step_seconds in seconds.items():
+        print(f"Seconds in {step}: {step_seconds:.1f}", file=sys.stderr)
+
+
+def sort_reddit_languages(
+    output_dir: str,
+    dump_files: List[str],
+    languages: Optional[List[str]] = None,
+    workers: int = 4,
+    block_lines: int = DEFAULT_BLOCK_LINES,
+):
+    """
+    Sort the comments in monthly Reddit dumps by language, writing the ones
+    that belong in the corpus to `{output_dir}/{lang}.txt.gz` for each
+    language in `languages`, which defaults to all the languages we take from
+    Reddit. Every one of these files is written, even if it gets no comments.
+
+    The dumps are read in blocks of `block_lines` lines, which are handled in
+    `workers` processes. At the end, the number of comments rejected at each
+    stage, and the time the workers spent on each step, are reported to
+    stderr.
+    """
+    if not languages:
+        languages = SOURCE_LANGUAGES['reddit']
+    if any(Path(filename).suffix == '.zst' for filename in dump_files):
+        # Make sure we can decompress every dump before we start on them,
+        # because the dumps are opened in a background thread
+        import zstandard  # noqa: F401
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    outputs = {
+        lang: open(Path(output_dir) / f'{lang}.txt.gz', 'wb') for lang in languages
+    }
+    counts = Counter()
+    seconds = Counter()
+    try:
+        # Decompress the next blocks in the background while sorting these
+        blocks = prefetch_iterator(read_line_blocks(dump_files, block_lines), 2)
+        sort_block = partial(_sort_block, frozenset(languages))
+        if workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker
+            )
+            block_results = imap_ordered(
+                executor, sort_block, blocks, max_pending=workers * 2
+            )
+        else:
+            executor = contextlib.nullcontext()
+            _init_worker()
+            block_results = map(sort_block, blocks)
+
+        with executor:
+            for block_outputs, block_counts, block_seconds in block_results:
+                for lang, data in block_outputs.items():
+                    outputs[lang].write(data)
+                counts.update(block_counts)
+                seconds.update(block_seconds)
+
+        # An empty file isn't valid gzip, so give each empty output an empty
+        # gzip member
+        for output in outputs.values():
+            if output.tell() == 0:
+                output.write(gzip.compress(b''))
+    finally:
+        for output in outputs.values():
+            output.close()
+    report_counts(counts, seconds)
+
+
+SUBREDDIT_LANGUAGES = {
+    '600euro': ['de'],
+    'aarhus': ['da'],
+    'aeiou': ['de'],
+    'agraelus': ['cs'],
+    'afdwatch': ['de'],
+    'aktiemarknaden': ['sv'],
+    'albania': ['sq'],
+    'allsvenskan': ['sv'],
+    'alt_fakten': ['de'],
+    'altgreece': ['el'],
+    'ametistru': ['ru'],
+    'amizadevirtual': ['pt'],
+    'amsterdam': ['nl'],
+    'ani_bm': ['he'],
+    'animeitaly': ['it'],
+    'anormaldayinrussia': ['ru'],
+    'arabs': ['ar'],
+    'argaming': ['es'],
+    'argentina': ['es'],
+    'argentinabenderstyle': ['es'],
+    'argentos': ['es'],
+    'armemeia': ['hy'],
+    'armenia': ['hy'],
+    'arkisuomi': ['fi'],
+    'asklatinamerica': ['es'],
+    'askspain': ['es'],
+    'asiatripper': ['zh-Hans'],
+    'austria': ['de'],
+    'automobil': ['de'],
+    'bakanewsjp': ['ja'],
+    'bakchodi': ['hi'],
+    'bancadelmeme': ['it'],
+    'barclona': ['es'],
+    'baris_irl': ['tr'],
+    'baxov': ['cs'],
+    'belgica': ['nl'],
+    'belgium': ['nl'],
+    'belohorizonte': ['pt'],
+    'benfica': ['pt'],
+    'berlin': ['de'],
+    'biblioteca': ['pt'],
+    'bgy': ['tr'],
+    'bocajuniors': ['es'],
+    'brasil': ['pt'],
+    'brasil_drama': ['pt'],
+    'brasilcentro': ['pt'],
+    'brasildob': ['pt'],
+    'brasilivre': ['pt'],
+    'brasilnoticias': ['pt'],
+    'brasilonreddit': ['pt'],
+    'buecher': ['de'],
+    'bundeswehr': ['de'],
+    'bulgaria': ['bg'],
+    'bundesliga': ['de'],
+    'burdurland': ['tr'],
+    'cabocajuniors': ['es'],
+    'canada': ['fr'],
+    'canadaguns': ['fr'],
+    'canadapoliticshumor': ['fr'],
+    'canadients': ['fr'],
+    'cariverplate': ['es'],
+    'casualph': ['tl'],
+    'catalunya': ['ca'],
+    'cellbits': ['pt'],
+    'chernobyl': ['uk'],
+    'chile': ['es'],
+    'china_irl': ['zh-Hans'],
+    'chonglangtv': ['zh'],
+    'colombia': ['es'],
+    'conseiljuridique': ['fr'],
+    'croatia': ['hr'],
+    'czech': ['cs'],
+    'dachschaden': ['de'],
+    'danishents': ['da'],
+    'dankgentina': ['es'],
+    'dankmark': ['da'],
+    'de': ['de'],
+    'de_edv': ['de'],
+    'de_iama': ['de'],
+    'demorda': ['uk'],
+    'denmark': ['da'],
+    'derechogenial': ['es'],
+    'derwachsen': ['de'],
+    'desabafos': ['pt'],
+    'dkfinance': ['da'],
+    'dndnl': ['nl'],
+    'duklock': ['cs', 'sk'],
+    'dutchfire': ['nl'],
+    'dsa_rpg': ['de'],
+    'ecuador': ['es'],
+    'ecuadornoticias': ['es'],
+    'eesti': ['et'],
+    'egypt': ['ar'],
+    'einfach_posten': ['de'],
+    'eredivisie': ['nl'],
+    'everlastingsummerru': ['ru'],
+    'es': ['es'],
+    'espanol': ['es'],
+    'esperanto': ['eo'],
+    'europe': ['de', 'es', 'fr', 'it', 'nl', 'ru', 'sv', 'uk'],
+    'exlldm': ['es'],
+    'fabricadenoobs': ['pt'],
+    'fahrrad': ['de'],
+    'fashionrepspolska': ['pl'],
+    'feminisme': ['fr'],
+    'fenerbahcesk': ['tr'],
+    'fewjar': ['de'],
+    'fcporto': ['pt'],
+    'filme': ['de'],
+    'filosofia': ['pt'],
+    'financaspessoaispt': ['pt'],
+    'finanzen': ['de'],
+    'flamengo': ['pt'],
+    'forum_democratie': ['nl'],
+    'fosttalicska': ['hu'],
+    'fragreddit': ['de'],
+    'france': ['fr'],
+    'francelibre': ['fr'],
+    'francophonie': ['fr'],
+    'freedutch': ['nl'],
+    'french': ['fr'],
+    'frenchhelp': ['fr'],
+    'fulbo': ['es'],
+    'futebol': ['pt'],
+    'g0ularte': ['pt'],
+    'gamemeneersubmissies': ['nl'],
+    'gamesecultura': ['pt'],
+    'geldzaken': ['nl'],
+    'german': ['de'],
+    'germantrees': ['de'],
+    'germany': ['de'],
+    'germanrap': ['de'],
+    'gothenburg': ['sv'],
+    'greece': ['el'],
+    'guatemala': ['es'],
+    'hamburg': ['de'],
+    'hanguk': ['ko'],
+    'hanzememes': ['nl'],
+    'helsinki': ['fi'],
+    'hungarian': ['hu'],
+    'hungary': ['hu'],
+    'iceland': ['is'],
+    'ich_iel': ['de'],
+    'ik_ihe': ['nl'],
+    'iksdagen': ['sv'],
+    'indianonpolitical': ['hi'],
+    'indonesia': ['id'],
+    'investimentos': ['pt'],
+    'israel': ['he'],
+    'italia': ['it'],
+    'italian': ['it'],
+    'italy': ['it'],
+    'italyinformatica': ['it'],
+    'italymotori': ['it'],
+    'ithadtobebrazil': ['pt'],
+    'jesubrodre': ['da'],
+    'jeremyfrieser': ['nl'],
+    'jeuxvideo': ['fr'],
+    'jisakupc': ['ja'],
+    'jogatina': ['pt'],
+    'justvidman': ['hu'],
+    'kerala': ['ml'],
+    'kgbtr': ['tr'],
+    'klengan': ['de'],
+    'kopyamakarna': ['tr'],
+    'kosovo': ['sq'],
+    'labelleprovince': ['fr'],
+    'laesterschwestern': ['de'],
+    'lal_salaam': ['ml'],
+    'latinopeopletwitter': ['es'],
+    'latvia': ['lv'],
+    'learnspanish': ['es'],
+    'learnjapanese': ['ja'],
+    'lekkerspelen': ['nl'],
+    'liberta': ['ru'],
+    'ligue1': ['fr'],
+    'lisboa': ['pt'],
+    'lithuania': ['lt'],
+    'litigi': ['it'],
+    'livros': ['pt'],
+    'ltb_iel': ['de'],
+    'maau': ['es'],
+    'madrid': ['es'],
+    'malaysia': ['ms'],
+    'memederwoche': ['de'],
+    'memexico': ['es'],
+    'mercadoreddit': ['es'],
+    'merval': ['es'],
+    'metaquebec': ['fr'],
+    'mexico': ['es'],
+    'militaresenreddit': ['es'],
+    'mitosyleyendasonline': ['es'],
+    'mkd': ['mk'],
+    'moldova': ['ro'],
+    'monterrey': ['es'],
+    'montreal': ['fr'],
+    'montrealimpact': ['fr'],
+    'motorsports_ja': ['ja'],
+    'mujico': ['es'],
+    'nederlands': ['nl'],
+    'newsbahia': ['pt'],
+    'newsdk': ['da'],
+    'newsnepal': ['ne'],
+    'newsg': ['ja'],
+    'newsokunomoral': ['ja'],
+    'newsokur': ['ja'],
+    'nhaa': ['pt'],
+    'ni_bondha': ['te'],
+    'nicaragua': ['es'],
+    'noboctb': ['ru'],
+    'norge': ['no'],
+    'norskfotball': ['no'],
+    'notargentina': ['es'],
+    'oknotizie': ['it'],
+    'panama': ['es'],
+    'paraguay': ['es'],
+    'paris': ['fr'],
+    'patopapao': ['pt'],
+    'perguntereddit': ['pt'],
+    'personalfinancecanada': ['fr'],
+    'peru': ['es'],
+    'pescocofino': ['pt'],
+    'philippines': ['tl', 'ceb'],
+    'phr4r': ['tl'],
+    'pietsmiet': ['de'],
+    'pikabu': ['hy', 'ru'],
+    'pikabuoc': ['ru'],
+    'pikabupolitics': ['ru'],
+    'podemos': ['es'],
+    'poldersocialisme': ['nl'],
+    'poland': ['pl'],
+    'polska': ['pl'],
+    'popular_science_ru': ['pt'],
+    'portugal': ['pt'],
+    'portugalcaralho': ['pt'],
+    'portugallafora': ['pt'],
+    'portugalnews': ['pt'],
+    'portuguese': ['pt'],
+    'prague': ['cs'],
+    'primeiraliga': ['pt'],
+    'projetohumanos': ['pt'],
+    'puertorico': ['es'],
+    'quebec': ['fr'],
+    'rance': ['fr'],
+    'rbtv_cj': ['de'],
+    'redditvn': ['vi'],
+    'republicaargentina': ['es'],
+    'republica_argentina': ['es'],
+    'robac': ['ro'],
+    'rocketbeans': ['de'],
+    'roma': ['it'],
+    'romania': ['ro'],
+    'romemes': ['ro'],
+    'rothwellden': ['cs'],
+    'rotterdam': ['nl'],
+    'rpg_brasil': ['pt'],
+    'ru': ['ru'],
+    'ru_anime': ['ru'],
+    'rupolitika': ['ru'],
+    'russia': ['ru'],
+    'russian': ['ru'],
+    'sakartvelo': ['ka'],
+    'santiago': ['es'],
+    'saopaulo': ['pt'],
+    'saopaulofc': ['pt'],
+    'saraba1st': ['zh-Hans'],
+    'saraba2nd': ['zh-Hans'],
+    'saudiarabia': ['ar'],
+    'scandinavia': ['da', 'no', 'sv'],
+    'serbia': ['sr'],
+    'slovakia': ['sk'],
+    'slovenia': ['sl'],
+    'soccer': ['de', 'es', 'fi', 'fr', 'he', 'it', 'nl', 'no', 'pt', 'tr'],
+    'spain': ['es'],
+    'spanish': ['es'],
+    'sportingcp': ['pt'],
+    'sprechstunde': ['de'],
+    'sqdc': ['fr'],
+    'stanga': ['ro'],
+    'stockholm': ['sv'],
+    'suomi': ['fi'],
+    'superlig': ['tr'],
+    'svenska': ['sv'],
+    'sverige': ['sv'],
+    'sveriges_politik': ['sv'],
+    'svenskpolitik': ['sv'],
+    'svihs': ['tr'],
+    'swarje': ['sv'],
+    'sweddituniversalis': ['sv'],
+    'sweden': ['sv'],
+    'swedents': ['sv'],
+    'swedishproblems': ['sv'],
+    'tamamahbapengelli': ['tr'],
+    'tecnologia': ['es'],
+    'thaithai': ['th'],
+    'thepanturkism': ['tr'],
+    'tijuana': ['es'],
+    'tiodopave': ['pt'],
+    'thenetherlands': ['nl'],
+    'toronto': ['fr'],
+    'turkey': ['tr'],
+    'turkeylgbt': ['tr'],
+    'turkeymiddleeast': ['ar'],
+    'uacommunity': ['ru', 'uk'],
+    'unket': ['sv'],
+    'ukraina': ['ru', 'uk'],
+    'uruguay': ['es'],
+    'vegande': ['de'],
+    'venezuela': ['es'],
+    'vfbstuttgart': ['de'],
+    'vosfinances': ['fr'],
+    'vrouwvolk': ['nl'],
+    'vzla': ['es'],
+    'wallonia': ['fr'],
+    'wasletztepreis': ['de'],
+    'weibsvolk': ['de'],
+    'wien': ['de'],
+    'wortwitzkasse': ['de'],
+    'yapanfasha': ['he'],
+    'yointerneto': ['es'],
+    'youtubememesfr': ['fr'],
+}
+
+
+def main():
+    typer.run(sort_reddit_languages)
+
+
+if __name__ == "__main__":
+    main()
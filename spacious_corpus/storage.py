@@ -3,16 +3,194 @@ This module provides the DocZip class, for reading and writing large numbers
 of tokenized documents in spaCy form.
 """
 from spacy.tokens import DocBin, Doc
+from spacy.vocab import Vocab
 
+import contextlib
 import itertools
-from zipfile import ZipFile
-import tempfile
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from zipfile import BadZipFile, ZipFile, ZIP_STORED, ZIP_DEFLATED, ZIP_BZIP2, ZIP_LZMA
 from pathlib import Path
-from typing import Iterable, Iterator, Union, List
+from typing import Iterable, Iterator, Union, List, Optional, Tuple
 from .nlp import make_nlp_stack
+from .util import imap_ordered, prefetch_iterator
 
 PathLike = Union[Path, str]
 
+# The name of the .zip member that lists the chunks and how many documents
+# each of them contains
+MANIFEST_NAME = "manifest.json"
+
+# While a DocZip is being written, its .zip comment holds a checkpoint
+# starting with this prefix, followed by JSON
+CHECKPOINT_PREFIX = b"spacious_corpus.checkpoint\n"
+
+# Chunks that are stored as a sequence of smaller DocBins start with this
+# header. Each DocBin follows as an 8-byte little-endian length and the
+# DocBin's serialized bytes.
+BLOCKS_HEADER = b"spacious_corpus.blocks\n"
+BLOCK_LENGTH_BYTES = 8
+
+DEFAULT_BLOCK_SIZE = 10_000
+
+# Compression methods for the .zip members. The DocBins are already
+# compressed, so by default they're stored as is.
+COMPRESSION_METHODS = {
+    "stored": ZIP_STORED,
+    "deflated": ZIP_DEFLATED,
+    "bzip2": ZIP_BZIP2,
+    "lzma": ZIP_LZMA,
+}
+
+# Chunks are ended when their texts add up to this many characters, so that
+# sources with long documents and sources with short ones produce chunks of
+# similar sizes
+DEFAULT_CHUNK_CHARS = 50_000_000
+
+
+def get_compression_method(compression: str) -> int:
+    """
+    Get the zipfile constant for a compression method named in
+    `COMPRESSION_METHODS`, raising a ValueError for an unknown name.
+    """
+    if compression not in COMPRESSION_METHODS:
+        raise ValueError(
+            f"Unknown compression method: {compression!r} "
+            f"(choose from {', '.join(COMPRESSION_METHODS)})"
+        )
+    return COMPRESSION_METHODS[compression]
+
+
+def _group_chunks(
+    stream: Iterable[str], chunk_size: int, chunk_chars: int
+) -> Iterator[List[str]]:
+    """
+    Group a stream of texts into lists that will each be stored as a chunk.
+    A chunk ends when it contains `chunk_size` texts, or when the lengths of
+    its texts add up to at least `chunk_chars` characters. If `chunk_chars`
+    is 0, only the number of texts counts.
+    """
+    chunk = []
+    num_chars = 0
+    for text in stream:
+        chunk.append(text)
+        num_chars += len(text)
+        if len(chunk) >= chunk_size or (chunk_chars and num_chars >= chunk_chars):
+            yield chunk
+            chunk = []
+            num_chars = 0
+    if chunk:
+        yield chunk
+
+
+def _tokenize_chunk(
+    lang: str, batch_size: int, block_size: int, texts: List[str]
+) -> Tuple[bytes, int, int]:
+    """
+    Tokenize a chunk of document texts, returning the bytes of the chunk, the
+    number of documents in it, and the number of texts it was made from.
+
+    If `block_size` is positive, the chunk is a sequence of DocBins of up to
+    `block_size` documents each, which can be decoded one at a time.
+    Otherwise, the chunk is one DocBin.
+    """
+    # Load a new NLP stack for every chunk, to avoid unbounded memory usage
+    nlp = make_nlp_stack(lang)
+    num_texts = len(texts)
+    texts = (text for text in texts if len(text) <= nlp.max_length)
+    docs = nlp.pipe(texts, batch_size=batch_size)
+    if block_size <= 0:
+        doc_bin = DocBin(attrs=[], docs=docs)
+        return doc_bin.to_bytes(), len(doc_bin), num_texts
+
+    parts = [BLOCKS_HEADER]
+    num_docs = 0
+    while True:
+        doc_bin = DocBin(attrs=[], docs=itertools.islice(docs, block_size))
+        if len(doc_bin) == 0:
+            break
+        block = doc_bin.to_bytes()
+        parts.append(len(block).to_bytes(BLOCK_LENGTH_BYTES, "little"))
+        parts.append(block)
+        num_docs += len(doc_bin)
+    return b"".join(parts), num_docs, num_texts
+
+
+class _DocZipReader:
+    """
+    The resources for reading a DocZip: the open .zip file, and an NLP stack
+    whose Vocab is shared by the Docs from every chunk. The NLP stack is only
+    loaded when documents are first read.
+    """
+
+    def __init__(self, path: PathLike, lang: str):
+        self.lang = lang
+        self.zip_file = ZipFile(path, mode="r")
+        self._nlp = None
+
+    @property
+    def vocab(self) -> Vocab:
+        if self._nlp is None:
+            self._nlp = make_nlp_stack(self.lang)
+        return self._nlp.vocab
+
+    def get_chunks(self) -> List[str]:
+        return [name for name in self.zip_file.namelist() if name.endswith(".spacy")]
+
+    def get_manifest(self) -> Optional[dict]:
+        if MANIFEST_NAME not in self.zip_file.namelist():
+            return None
+        return json.loads(self.zip_file.read(MANIFEST_NAME))
+
+    def read_doc_bins(self, chunkname: str) -> Iterator[DocBin]:
+        """
+        Decode the DocBins in a chunk. A chunk stored as blocks is streamed
+        from the .zip file one block at a time; otherwise, the whole chunk
+        is one DocBin.
+        """
+        with self.zip_file.open(chunkname) as chunk_file:
+            header = chunk_file.read(len(BLOCKS_HEADER))
+            if header != BLOCKS_HEADER:
+                doc_bin = DocBin(attrs=[])
+                yield doc_bin.from_bytes(header + chunk_file.read())
+                return
+
+            while True:
+                length_bytes = chunk_file.read(BLOCK_LENGTH_BYTES)
+                if not length_bytes:
+                    return
+                length = int.from_bytes(length_bytes, "little")
+                doc_bin = DocBin(attrs=[])
+                yield doc_bin.from_bytes(chunk_file.read(length))
+
+    def iterate_chunk(self, chunkname: str) -> Iterator[Doc]:
+        for doc_bin in self.read_doc_bins(chunkname):
+            yield from doc_bin.get_docs(self.vocab)
+
+    def iterate_chunks(
+        self, chunknames: List[str], prefetch: int = 0
+    ) -> Iterator[Doc]:
+        """
+        Iterate the documents of several chunks in order. If `prefetch` is
+        positive, up to that many DocBins are read and decoded ahead of time
+        in a background thread.
+        """
+        doc_bins = itertools.chain.from_iterable(map(self.read_doc_bins, chunknames))
+        if prefetch > 0:
+            doc_bins = prefetch_iterator(doc_bins, prefetch)
+        try:
+            for doc_bin in doc_bins:
+                yield from doc_bin.get_docs(self.vocab)
+        finally:
+            # Stop the background thread before the .zip file can be closed
+            if prefetch > 0:
+                doc_bins.close()
+
+    def close(self):
+        self.zip_file.close()
+
 
 class DocZip:
     """
@@ -23,21 +201,43 @@ class DocZip:
     names such as `en_000.spacy`, `en_001.spacy`, etc.
 
     Each .spacy file contains up to a specified number of documents, 1
-    million by default. This number should be decreased if the documents
-    are long, because the documents in each chunk are read into memory
-    all at once.
+    million by default, and stops early when its texts add up to
+    `DEFAULT_CHUNK_CHARS` characters. By default, a chunk is stored as a sequence of
+    smaller DocBins (with `DEFAULT_BLOCK_SIZE` documents each), which are
+    read from the .zip file and decoded one at a time, so memory usage
+    while reading depends on the block size and not the chunk size. A chunk
+    can also be written as a single DocBin -- a standard .spacy file -- but
+    then all of its documents are read into memory at once.
 
     (The leading zeros make it easier to list the parts in sorted order,
     as long as there are 1000 or fewer chunks, but it's okay for there
     to be more than 1000.)
+
+    While it's being written, the .zip file is closed and valid after each
+    chunk, with a checkpoint in its comment saying how many texts have been
+    written. If writing is interrupted, `.write_stream(..., resume=True)` can
+    continue from the checkpoint.
+
+    The .zip file also contains a small JSON file, `manifest.json`, listing
+    the chunks in order with the number of documents in each one. This lets
+    `.iterate_from()` skip to a document without decoding the chunks before
+    it. DocZips written before the manifest existed can still be read.
+
+    A DocZip can be used as a context manager for reading:
+
+        with DocZip.open(path, lang) as doc_zip:
+            for chunkname in doc_zip.get_chunks():
+                ...
+
+    Inside the `with` block, the .zip file stays open and one NLP stack is
+    loaded, so all the Docs that are read share the same Vocab. Outside of
+    it, each method opens the .zip file and loads the NLP stack for itself.
     """
 
     def __init__(self, path: PathLike, lang: str):
         self.lang = lang
         self.path = path
-    
-    def _make_nlp_stack(self):
-        return make_nlp_stack(self.lang)
+        self._shared_reader: Optional[_DocZipReader] = None
 
     @staticmethod
     def open(path: PathLike, lang: str) -> "DocZip":
@@ -46,65 +246,300 @@ class DocZip:
         it just calls the constructor.
 
         There's no need to close a DocZip, because the actual file is only open
-        for reading or writing inside of methods when it needs to be.
+        for reading or writing inside of methods when it needs to be -- unless
+        you use it as a context manager, which keeps the file open for reading
+        until the end of the `with` block.
         """
         return DocZip(path, lang)
 
+    def __enter__(self) -> "DocZip":
+        self._shared_reader = _DocZipReader(self.path, self.lang)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Close the .zip file that was opened by using the DocZip as a context
+        manager. Does nothing if it isn't open.
+        """
+        if self._shared_reader is not None:
+            self._shared_reader.close()
+            self._shared_reader = None
+
+    @contextlib.contextmanager
+    def _reader(self) -> Iterator[_DocZipReader]:
+        """
+        Get the resources for reading this DocZip: the shared ones if we're
+        inside a `with` block, or else new ones that are closed afterward.
+        """
+        if self._shared_reader is not None:
+            yield self._shared_reader
+        else:
+            reader = _DocZipReader(self.path, self.lang)
+            try:
+                yield reader
+            finally:
+                reader.close()
+
     def iterate_chunk(self, chunkname: str) -> Iterator[Doc]:
         """
         Iterate the documents from one chunk, specified by its filename
         within the .zip.
         """
-        doc_bin = DocBin(attrs=[])
-        nlp = self._make_nlp_stack()
-        with ZipFile(self.path, mode="r") as zip_file:
-            part_bytes = zip_file.read(chunkname)
-            doc_bin.from_bytes(part_bytes)
-        yield from doc_bin.get_docs(nlp.vocab)
+        with self._reader() as reader:
+            yield from reader.iterate_chunk(chunkname)
 
     def get_chunks(self) -> List[str]:
         """
         Get the names of all the chunks, which can be passed to
         .iterate_chunk().
         """
-        with ZipFile(self.path, mode="r") as zip_file:
-            return zip_file.namelist()
+        with self._reader() as reader:
+            return reader.get_chunks()
 
-    def iterate(self) -> Iterator[Doc]:
+    def get_manifest(self) -> Optional[dict]:
+        """
+        Get the manifest of the DocZip, a dictionary whose 'chunks' entry is a
+        list of dictionaries with the 'name' of each chunk and the number of
+        'docs' in it. Returns None if the DocZip has no manifest.
+        """
+        with self._reader() as reader:
+            return reader.get_manifest()
+
+    def get_checkpoint(self) -> Optional[dict]:
+        """
+        Get the checkpoint of a DocZip whose writing was interrupted, or None
+        if the DocZip is complete or doesn't exist. The checkpoint is a
+        dictionary whose 'texts' entry is how many texts of the input stream
+        have been written, and whose 'docs' entry lists the number of
+        documents in each chunk written so far.
+        """
+        try:
+            with ZipFile(self.path, mode="r") as zip_file:
+                comment = zip_file.comment
+        except (FileNotFoundError, BadZipFile):
+            return None
+        if not comment.startswith(CHECKPOINT_PREFIX):
+            return None
+        return json.loads(comment[len(CHECKPOINT_PREFIX) :])
+
+    def iterate(self, prefetch: int = 0) -> Iterator[Doc]:
         """
         Iterate all documents from all chunks, in order.
+
+        If `prefetch` is positive, a background thread reads and decodes up to
+        that many DocBins (blocks, or entire chunks that aren't split into
+        blocks) ahead of the one whose documents are being consumed. This
+        overlaps the decompression with whatever is done with the documents,
+        at the cost of keeping those DocBins in memory.
+        """
+        with self._reader() as reader:
+            yield from reader.iterate_chunks(reader.get_chunks(), prefetch=prefetch)
+
+    def iterate_from(self, doc_index: int, prefetch: int = 0) -> Iterator[Doc]:
+        """
+        Iterate all documents in order, starting from the document numbered
+        `doc_index` (counting from 0). `prefetch` works as in `.iterate()`.
+
+        The manifest is used to find the chunk that contains that document,
+        so only that chunk's earlier documents have to be skipped. If the
+        DocZip has no manifest, all the earlier documents are decoded and
+        skipped instead.
         """
-        for chunkname in self.get_chunks():
-            yield from self.iterate_chunk(chunkname)
+        with self._reader() as reader:
+            manifest = reader.get_manifest()
+            if manifest is None:
+                chunknames = reader.get_chunks()
+            else:
+                chunknames = []
+                for chunk in manifest["chunks"]:
+                    if chunknames or doc_index < chunk["docs"]:
+                        chunknames.append(chunk["name"])
+                    else:
+                        doc_index -= chunk["docs"]
+
+            docs = reader.iterate_chunks(chunknames, prefetch=prefetch)
+            yield from itertools.islice(docs, doc_index, None)
 
     def __iter__(self) -> Iterator[Doc]:
         return self.iterate()
 
-    def write_stream(self, stream: Iterable[str], chunk_size: int = 1_000_000):
+    def write_stream(
+        self,
+        stream: Iterable[str],
+        chunk_size: int = 1_000_000,
+        chunk_chars: int = DEFAULT_CHUNK_CHARS,
+        workers: int = 1,
+        batch_size: int = 1000,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        compression: str = "stored",
+        compresslevel: Optional[int] = None,
+        resume: bool = False,
+    ):
         """
         Take in a stream of document texts, tokenize them, and store them
         in the DocZip.
+
+        A new chunk is started after `chunk_size` texts, or after the texts
+        add up to `chunk_chars` characters, whichever comes first. The
+        character budget keeps the chunks of roughly uniform size, whether
+        the documents are short subtitles or long web pages. Set
+        `chunk_chars` to 0 to split chunks by the number of texts only.
+
+        Texts are tokenized with `nlp.pipe`, in batches of `batch_size`.
+        Texts longer than `nlp.max_length` are skipped.
+
+        Each chunk is stored as blocks of `block_size` documents, which can be
+        decoded separately. If `block_size` is 0, each chunk is stored as a
+        single DocBin instead.
+
+        The chunks are written into the .zip file directly from memory, using
+        the `compression` method named in `COMPRESSION_METHODS` and its
+        `compresslevel`.
+
+        If `workers` is more than 1, chunks are tokenized in that many worker
+        processes, each with its own NLP stack. The chunks are still written
+        in order, so the result is the same as tokenizing them serially. Up
+        to two chunks per worker are held in memory while they're waiting to
+        be tokenized.
+
+        After each chunk, the .zip file is closed with a checkpoint in its
+        comment. If `resume` is True and the DocZip has a checkpoint from an
+        interrupted write, the chunks it has are kept, the texts they were
+        made from are skipped at the start of `stream`, and new chunks are
+        added after them. Otherwise, the DocZip is written from scratch.
+        The stream has to contain the same texts as before for this to make
+        sense. If reading the stream raises an error, the chunks that were
+        read before it are still tokenized and checkpointed before the error
+        is re-raised, with any number of workers.
+
+        The .zip file is only modified between chunks, so it remains valid
+        if the process is killed while tokenizing, which is where nearly all
+        the time goes.
         """
+        # Check the compression method before the file is overwritten
+        compression_method = get_compression_method(compression)
+        checkpoint = self.get_checkpoint() if resume else None
+        if checkpoint is None:
+            checkpoint = {"texts": 0, "docs": []}
+            with ZipFile(self.path, mode="w") as zip_file:
+                self._write_checkpoint(zip_file, checkpoint)
+
+        stream = itertools.islice(stream, checkpoint["texts"], None)
+        chunks = _group_chunks(stream, chunk_size, chunk_chars)
+        tokenize = partial(_tokenize_chunk, self.lang, batch_size, block_size)
+        write_chunks = partial(
+            self._write_chunks,
+            checkpoint=checkpoint,
+            compression=compression_method,
+            compresslevel=compresslevel,
+        )
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunk_results = imap_ordered(
+                    executor, tokenize, chunks, max_pending=workers * 2
+                )
+                write_chunks(chunk_results)
+        else:
+            chunk_results = map(tokenize, chunks)
+            write_chunks(chunk_results)
+
+    def write_concatenated(
+        self,
+        sources: Iterable[PathLike],
+        compression: str = "stored",
+        compresslevel: Optional[int] = None,
+    ):
+        """
+        Write the chunks of other DocZips in the same language, in order, into
+        this DocZip, renumbering them sequentially. This assembles the parts
+        of a corpus that were tokenized separately, such as shards of a
+        Wikipedia dump, without decoding their documents again.
+
+        The chunks are copied in a streaming way, so they don't have to fit
+        in memory. `compression` and `compresslevel` work as in
+        `.write_stream()`.
+        """
+        compression_method = get_compression_method(compression)
+        with ZipFile(
+            self.path,
+            mode="w",
+            compression=compression_method,
+            compresslevel=compresslevel,
+        ) as zip_file:
+            manifest_chunks = []
+            for source in sources:
+                source_zip = DocZip(source, self.lang)
+                manifest = source_zip.get_manifest()
+                if manifest is None:
+                    # Count the documents the slow way, for a DocZip written
+                    # before there were manifests
+                    source_chunks = []
+                    for chunkname in source_zip.get_chunks():
+                        num_docs = sum(1 for _ in source_zip.iterate_chunk(chunkname))
+                        source_chunks.append({"name": chunkname, "docs": num_docs})
+                else:
+                    source_chunks = manifest["chunks"]
+
+                with ZipFile(source, mode="r") as source_file:
+                    for source_chunk in source_chunks:
+                        filename = self._chunk_name(len(manifest_chunks))
+                        with source_file.open(source_chunk["name"]) as infile:
+                            with zip_file.open(
+                                filename, mode="w", force_zip64=True
+                            ) as member:
+                                shutil.copyfileobj(infile, member)
+                        manifest_chunks.append(
+                            {"name": filename, "docs": source_chunk["docs"]}
+                        )
+            self._write_manifest(zip_file, manifest_chunks)
+
+    def _chunk_name(self, chunk_num: int) -> str:
+        return f"{self.lang}_{chunk_num:>03d}.spacy"
+
+    def _write_chunks(
+        self,
+        chunk_results: Iterable[Tuple[bytes, int, int]],
+        checkpoint: dict,
+        compression: int,
+        compresslevel: Optional[int],
+    ):
+        """
+        Append serialized chunks to the .zip file, numbered sequentially after
+        the ones in the `checkpoint`, followed by the manifest that lists
+        them. The .zip file is reopened for each chunk, and closed with an
+        updated checkpoint afterward.
+        """
+        for data, num_docs, num_texts in chunk_results:
+            with ZipFile(
+                self.path,
+                mode="a",
+                compression=compression,
+                compresslevel=compresslevel,
+            ) as zip_file:
+                filename = self._chunk_name(len(checkpoint["docs"]))
+                # Chunks may be over 2 GiB, which needs the ZIP64 extension
+                with zip_file.open(filename, mode="w", force_zip64=True) as member:
+                    member.write(data)
+                checkpoint["texts"] += num_texts
+                checkpoint["docs"].append(num_docs)
+                self._write_checkpoint(zip_file, checkpoint)
+
+        manifest_chunks = [
+            {"name": self._chunk_name(chunk_num), "docs": num_docs}
+            for chunk_num, num_docs in enumerate(checkpoint["docs"])
+        ]
+        with ZipFile(self.path, mode="a") as zip_file:
+            self._write_manifest(zip_file, manifest_chunks)
+            # The DocZip is complete, so remove the checkpoint
+            zip_file.comment = b""
+
+    def _write_checkpoint(self, zip_file: ZipFile, checkpoint: dict):
+        zip_file.comment = CHECKPOINT_PREFIX + json.dumps(checkpoint).encode("utf-8")
 
-        def chunker(item):
-            return item[0] // chunk_size
-
-        with ZipFile(self.path, mode="w") as zip_file:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-                line_enumerator = enumerate(stream)
-                for (chunk_num, group) in itertools.groupby(line_enumerator, chunker):
-                    doc_bin = DocBin(attrs=[])
-
-                    # Reload the NLP stack in every chunk, to avoid unbounded
-                    # memory usage
-                    nlp = self._make_nlp_stack()
-                    for _num, text in group:
-                        if len(text) <= nlp.max_length:
-                            doc = nlp(text)
-                            doc_bin.add(doc)
-
-                    filename = f"{self.lang}_{chunk_num:>03d}.spacy"
-                    temp_file: Path = temp_path / f"{self.lang}_{chunk_num:>03d}.spacy"
-                    doc_bin.to_disk(temp_file)
-                    zip_file.write(temp_file, arcname=filename)
+    def _write_manifest(self, zip_file: ZipFile, manifest_chunks: List[dict]):
+        manifest = {"chunks": manifest_chunks}
+        with zip_file.open(MANIFEST_NAME, mode="w") as member:
+            member.write(json.dumps(manifest).encode("utf-8"))
@@ -1,14 +1,19 @@
 from ftfy import fix_text
 from ftfy.fixes import unescape_html, fix_surrogates
+from functools import lru_cache
 import re
 import sys
 import typer
+from typing import Callable, Optional
 
-from .storage import DocZip
-from .nlp import normalize_text
+from .storage import DocZip, DEFAULT_BLOCK_SIZE, DEFAULT_CHUNK_CHARS
+from .nlp import get_normalizer
 
 MAX_LINE_LENGTH = 1_000_000
 
+# How many distinct tokens to remember in each language's normalization cache
+NORMALIZE_CACHE_SIZE = 1_000_000
+
 
 DIGIT_RE = re.compile(r"\d")
 MULTI_DIGIT_RE = re.compile(r"\d[\d.,]+")
@@ -51,14 +56,70 @@ def normalize_token(text: str, lang: str):
     Apply all text normalizations, and replace multi-digit numbers with a
     representation of their shape (as in `smash_numbers`).
     """
-    return smash_numbers(normalize_text(text, lang))
+    return smash_numbers(get_normalizer(lang)(text))
+
+
+@lru_cache(maxsize=None)
+def get_token_normalizer(
+    lang: str, cache_size: int = NORMALIZE_CACHE_SIZE
+) -> Callable[[str], str]:
+    """
+    Get a function that applies `normalize_token` for the given language,
+    with a bounded LRU cache of its results.
+
+    Token frequencies follow Zipf's law, so most token occurrences are a
+    relatively small number of distinct strings, and the cache saves most of
+    the work of normalizing them. The same function is returned for each
+    language, so its cache is shared within a process. Its hit rate can be
+    checked with `.cache_info()`:
+
+    >>> normalizer = get_token_normalizer('en', cache_size=100)
+    >>> normalizer('Word')
+    'word'
+    >>> normalizer('Word')
+    'word'
+    >>> normalizer.cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=100, currsize=1)
+    """
 
+    normalize_text = get_normalizer(lang)
+
+    @lru_cache(maxsize=cache_size)
+    def normalize(text: str) -> str:
+        return smash_numbers(normalize_text(text))
+
+    return normalize
+
+
+def tokenize_stream(
+    lang,
+    stream,
+    output_file,
+    chunk_size=1_000_000,
+    chunk_chars=DEFAULT_CHUNK_CHARS,
+    use_ftfy=True,
+    workers=1,
+    batch_size=1000,
+    block_size=DEFAULT_BLOCK_SIZE,
+    compression="stored",
+    compresslevel: Optional[int] = None,
+    resume=False,
+):
+    doc_zip = DocZip.open(output_file, lang)
+    checkpoint = doc_zip.get_checkpoint() if resume else None
+    skip_texts = checkpoint["texts"] if checkpoint else 0
 
-def tokenize_stream(lang, stream, output_file, chunk_size=1_000_000, use_ftfy=True):
     def processed_stream():
+        num_texts = 0
         for line in stream:
             line = line.strip()
             if line and len(line) < MAX_LINE_LENGTH:
+                num_texts += 1
+                if num_texts <= skip_texts:
+                    # write_stream will skip this text because it was written
+                    # before, so don't spend time fixing it
+                    yield line
+                    continue
                 if use_ftfy:
                     line = fix_text(line.rstrip()).replace("\n", " ")
                 else:
@@ -68,13 +129,45 @@ def tokenize_stream(lang, stream, output_file, chunk_size=1_000_000, use_ftfy=Tr
                     )
                 yield line
 
-    doc_zip = DocZip.open(output_file, lang)
-    doc_zip.write_stream(processed_stream(), chunk_size=chunk_size)
+    doc_zip.write_stream(
+        processed_stream(),
+        chunk_size=chunk_size,
+        chunk_chars=chunk_chars,
+        workers=workers,
+        batch_size=batch_size,
+        block_size=block_size,
+        compression=compression,
+        compresslevel=compresslevel,
+        resume=resume,
+    )
 
 
-def tokenize_stdin(lang, output_file, chunk_size=1_000_000, use_ftfy=True):
+def tokenize_stdin(
+    lang: str,
+    output_file: str,
+    chunk_size: int = 1_000_000,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    use_ftfy: bool = True,
+    workers: int = 1,
+    batch_size: int = 1000,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    compression: str = "stored",
+    compresslevel: Optional[int] = None,
+    resume: bool = False,
+):
     tokenize_stream(
-        lang, sys.stdin, output_file, chunk_size=chunk_size, use_ftfy=use_ftfy
+        lang,
+        sys.stdin,
+        output_file,
+        chunk_size=chunk_size,
+        chunk_chars=chunk_chars,
+        use_ftfy=use_ftfy,
+        workers=workers,
+        batch_size=batch_size,
+        block_size=block_size,
+        compression=compression,
+        compresslevel=compresslevel,
+        resume=resume,
     )
 
 
@@ -199,6 +199,13 @@ KK_LATN_TABLE.update(
 )
 
 
+TRANSLITERATION_TABLES = {
+    "sr-Latn": SR_LATN_TABLE,
+    "az-Latn": AZ_LATN_TABLE,
+    "kk-Latn": KK_LATN_TABLE,
+}
+
+
 def transliterate(table, text):
     """
     Transliterate text according to one of the tables above.
@@ -210,11 +217,6 @@ def transliterate(table, text):
       Latin alphabet.
     - 'az-Latn' means the same for Azerbaijani Cyrillic to Latn.
     """
-    if table == "sr-Latn":
-        return text.translate(SR_LATN_TABLE)
-    elif table == "az-Latn":
-        return text.translate(AZ_LATN_TABLE)
-    elif table == "kk-Latn":
-        return text.translate(KK_LATN_TABLE)
-    else:
+    if table not in TRANSLITERATION_TABLES:
         raise ValueError("Unknown transliteration table: {!r}".format(table))
+    return text.translate(TRANSLITERATION_TABLES[table])
@@ -1,4 +1,7 @@
 from pkg_resources import resource_filename
+from collections import deque
+import queue
+import threading
 
 CONFIG_ROOT = resource_filename('spacious_corpus', 'config')
 import os
@@ -10,3 +13,82 @@ def config_filename(filename):
 
 def snakemake_filename():
     return config_filename('Snakefile')
+
+
+def imap_ordered(executor, func, iterable, max_pending):
+    """
+    Like `executor.map(func, iterable)`, but only submits up to `max_pending`
+    tasks ahead of the results that have been consumed, so that a long input
+    stream isn't read into memory all at once. Results are yielded in the
+    same order as their inputs.
+
+    With a ProcessPoolExecutor, `func` has to be picklable, so it should be a
+    top-level function, or a `functools.partial` of one.
+
+    If reading `iterable` raises an error, the results of the items that were
+    already submitted are yielded before the error is re-raised, so that the
+    consumer can keep the work that was done.
+    """
+    iterator = iter(iterable)
+    pending = deque()
+    while True:
+        try:
+            item = next(iterator)
+        except StopIteration:
+            break
+        except Exception:
+            while pending:
+                yield pending.popleft().result()
+            raise
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(func, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def prefetch_iterator(iterable, size):
+    """
+    Iterate the items of `iterable` in order, while a background thread
+    computes up to `size` items ahead of the consumer. The items in waiting
+    are held in a bounded queue, so memory stays bounded.
+
+    Exceptions raised while computing the items are re-raised in the consumer.
+    Closing this generator stops the background thread.
+    """
+    results = queue.Queue(maxsize=size)
+    stopped = threading.Event()
+
+    def put(entry):
+        # Wait for room in the queue, but give up if the consumer has stopped
+        while not stopped.is_set():
+            try:
+                results.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(("item", item)):
+                    return
+        except Exception as error:
+            put(("error", error))
+        else:
+            put(("done", None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            kind, value = results.get()
+            if kind == "done":
+                return
+            elif kind == "error":
+                raise value
+            yield value
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,352 @@
+"""
+Read Wikipedia's "multistream" XML dumps in parallel.
+
+A multistream dump is a sequence of independent bzip2 streams: the first
+one contains the <siteinfo> header, each of the following ones contains up
+to 100 pages, and the last one closes the </mediawiki> tag. It comes with
+an index file, with lines of the form `offset:page_id:title`, which gives
+the byte offset of the stream that each page is in.
+
+Because the streams are independent, we can decompress them in separate
+processes and write the results out in their original order. The output is
+the same as `bunzip2 -c`, so it can be piped into `wiki2text`.
+
+We can also split the dump into shards of whole streams, and run each shard
+through `wiki2text` and the tokenizer in its own process, assembling the
+results into one DocZip.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from zipfile import BadZipFile
+import bisect
+import bz2
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import typer
+
+from .storage import (
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_CHUNK_CHARS,
+    DocZip,
+    get_compression_method,
+)
+from .tokens import tokenize_stream
+from .util import imap_ordered
+
+# Decompress about this many bytes of bzip2 data in each task. It should be
+# large enough to make the overhead of a task small, but small enough that
+# the decompressed text of a few tasks per worker fits easily in memory.
+DEFAULT_GROUP_BYTES = 16_000_000
+
+
+def read_stream_offsets(index_filename: str) -> List[int]:
+    """
+    Get the byte offsets of the streams that contain pages, in order, from a
+    bzip2-compressed multistream index.
+    """
+    offsets = []
+    with bz2.open(index_filename, "rb") as index_file:
+        for line in index_file:
+            offset = int(line.split(b":", 1)[0])
+            if not offsets or offset != offsets[-1]:
+                offsets.append(offset)
+    return offsets
+
+
+def group_stream_ranges(
+    offsets: List[int],
+    file_size: int,
+    group_bytes: int = DEFAULT_GROUP_BYTES,
+    start: int = 0,
+) -> Iterator[Tuple[int, int]]:
+    """
+    Divide a multistream file into (start, end) byte ranges, each made of
+    whole streams and about `group_bytes` long.
+
+    The ranges cover the file from `start` to `file_size`. By default, that's
+    the whole file: the first range starts with the header stream that comes
+    before the first offset, and the last range runs to the end of the file,
+    including the stream that closes the XML.
+    """
+    for offset in offsets:
+        if offset - start >= group_bytes:
+            yield start, offset
+            start = offset
+    if start < file_size:
+        yield start, file_size
+
+
+def shard_stream_ranges(
+    offsets: List[int], file_size: int, num_shards: int
+) -> List[Tuple[int, int]]:
+    """
+    Divide the streams of pages in a multistream file into up to `num_shards`
+    (start, end) byte ranges of similar sizes. The header stream before the
+    first offset isn't included in any shard. The last shard runs to the end
+    of the file.
+    """
+    first = offsets[0]
+    bounds = [first]
+    for shard in range(1, num_shards):
+        target = first + (file_size - first) * shard // num_shards
+        # Move the boundary to the start of the stream containing the target
+        boundary = offsets[bisect.bisect_right(offsets, target) - 1]
+        if boundary > bounds[-1]:
+            bounds.append(boundary)
+    bounds.append(file_size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _decompress_range(filename: str, byte_range: Tuple[int, int]) -> bytes:
+    """
+    Decompress the bzip2 streams in one byte range of a file.
+    """
+    start, end = byte_range
+    with open(filename, "rb") as infile:
+        infile.seek(start)
+        data = infile.read(end - start)
+    # bz2.decompress handles the concatenated streams in the range
+    return bz2.decompress(data)
+
+
+def decompress_multistream(
+    dump_filename: str,
+    index_filename: str,
+    output: BinaryIO,
+    workers: int = 4,
+    group_bytes: int = DEFAULT_GROUP_BYTES,
+):
+    """
+    Decompress a multistream Wikipedia dump to the binary file `output`,
+    using `workers` processes.
+    """
+    offsets = read_stream_offsets(index_filename)
+    ranges = group_stream_ranges(
+        offsets, os.path.getsize(dump_filename), group_bytes
+    )
+    decompress = partial(_decompress_range, dump_filename)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for text in imap_ordered(
+            executor, decompress, ranges, max_pending=workers * 2
+        ):
+            output.write(text)
+    output.flush()
+
+
+def decompress_wikipedia(
+    dump_file: str,
+    index_file: str,
+    workers: int = 4,
+    group_bytes: int = DEFAULT_GROUP_BYTES,
+):
+    """
+    Decompress a multistream Wikipedia dump to standard output, like
+    `bunzip2 -c`, but in parallel.
+    """
+    decompress_multistream(
+        dump_file,
+        index_file,
+        sys.stdout.buffer,
+        workers=workers,
+        group_bytes=group_bytes,
+    )
+
+
+def _feed_shard(
+    dump_filename: str,
+    offsets: List[int],
+    shard_range: Tuple[int, int],
+    output: BinaryIO,
+):
+    """
+    Write the XML of one shard to `output`: the header, the pages in the
+    shard's byte range, and the closing tag if the shard doesn't contain the
+    real one.
+    """
+    start, end = shard_range
+    output.write(_decompress_range(dump_filename, (0, offsets[0])))
+    shard_offsets = [offset for offset in offsets if start <= offset < end]
+    for group in group_stream_ranges(shard_offsets, end, start=start):
+        output.write(_decompress_range(dump_filename, group))
+    if end != os.path.getsize(dump_filename):
+        output.write(b"</mediawiki>\n")
+
+
+def _is_complete(doc_zip: DocZip) -> bool:
+    """
+    Check whether a DocZip exists and was completely written.
+    """
+    try:
+        return doc_zip.get_checkpoint() is None and doc_zip.get_manifest() is not None
+    except (FileNotFoundError, BadZipFile):
+        return False
+
+
+@contextlib.contextmanager
+def _shard_directory(
+    output_file: str, temp_dir: Optional[str], resume: bool
+) -> Iterator[str]:
+    """
+    Get the directory to tokenize shards into. When resuming is possible, it's
+    a directory next to the output file, which is left in place if we don't
+    finish, so that the next run can find the shards. Otherwise, it's a
+    temporary directory.
+    """
+    if resume:
+        shard_dir = f"{output_file}.shards"
+        os.makedirs(shard_dir, exist_ok=True)
+        yield shard_dir
+        shutil.rmtree(shard_dir)
+    else:
+        with tempfile.TemporaryDirectory(dir=temp_dir) as shard_dir:
+            yield shard_dir
+
+
+def _tokenize_shard(
+    lang: str,
+    dump_filename: str,
+    offsets: List[int],
+    wiki2text: str,
+    tokenize_options: dict,
+    shard: Tuple[Tuple[int, int], str],
+) -> str:
+    """
+    Run one shard of the dump through `wiki2text` and tokenize its output
+    into a DocZip, returning the DocZip's path.
+
+    The XML is decompressed and fed to `wiki2text` in a separate thread, so
+    that it doesn't block on the pipe while we read `wiki2text`'s output.
+    """
+    shard_range, output_file = shard
+    if tokenize_options["resume"] and _is_complete(DocZip.open(output_file, lang)):
+        return output_file
+
+    proc = subprocess.Popen(
+        [wiki2text], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+    feed_errors = []
+
+    def feed():
+        try:
+            with proc.stdin:
+                _feed_shard(dump_filename, offsets, shard_range, proc.stdin)
+        except Exception as error:
+            feed_errors.append(error)
+
+    def read_lines():
+        with io.TextIOWrapper(proc.stdout, encoding="utf-8") as lines:
+            yield from lines
+        feeder.join()
+        returncode = proc.wait()
+        # Raise errors at the end of the stream, so that the DocZip isn't
+        # completed with missing text. If wiki2text failed, feeding it
+        # probably failed with a broken pipe, so its exit status is the more
+        # useful error.
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, wiki2text)
+        if feed_errors:
+            raise feed_errors[0]
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    tokenize_stream(lang, read_lines(), output_file, **tokenize_options)
+    return output_file
+
+
+def tokenize_wikipedia(
+    lang: str,
+    dump_file: str,
+    index_file: str,
+    output_file: str,
+    workers: int = 4,
+    shards: Optional[int] = typer.Option(
+        None, help="Number of shards to split the dump into (default: 2 per worker)"
+    ),
+    temp_dir: Optional[str] = typer.Option(
+        None, help="Directory for the tokenized shards"
+    ),
+    wiki2text: str = typer.Option("wiki2text", help="The wiki2text command"),
+    chunk_size: int = 1_000_000,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    use_ftfy: bool = True,
+    batch_size: int = 1000,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    compression: str = "stored",
+    compresslevel: Optional[int] = None,
+    resume: bool = typer.Option(
+        False, help="Keep the shards so that an interrupted run can continue"
+    ),
+):
+    """
+    Extract and tokenize the text of a multistream Wikipedia dump into a
+    DocZip, in parallel.
+
+    The dump is split into shards of whole streams. Each shard is
+    decompressed, run through `wiki2text`, and tokenized into a temporary
+    DocZip in one of `workers` processes. Then the chunks of those DocZips
+    are copied, in order, into `output_file`.
+
+    The documents come out in the same order as in the serial pipeline,
+    `bunzip2 -c | wiki2text | spacious-corpus-tokenize`, but the chunks are
+    split differently, because each shard ends with a partial chunk.
+
+    If `resume` is True, the shards are kept in the directory
+    `{output_file}.shards` until the output is assembled, instead of a
+    temporary directory. If a previous run with the same number of shards
+    was interrupted, its complete shards are kept, and its incomplete ones
+    continue from their checkpoints.
+    """
+    # Check the compression method before spending hours on the shards
+    get_compression_method(compression)
+    if shards is None:
+        shards = workers * 2
+    offsets = read_stream_offsets(index_file)
+    shard_ranges = shard_stream_ranges(
+        offsets, os.path.getsize(dump_file), shards
+    )
+    tokenize_options = dict(
+        chunk_size=chunk_size,
+        chunk_chars=chunk_chars,
+        use_ftfy=use_ftfy,
+        batch_size=batch_size,
+        block_size=block_size,
+        resume=resume,
+    )
+    num_shards = len(shard_ranges)
+    with _shard_directory(output_file, temp_dir, resume) as shard_dir:
+        # The number of shards is in the filenames, so that a resumed run
+        # only uses shards that were split the same way
+        shard_files = [
+            str(Path(shard_dir) / f"{lang}_{shard_num:>03d}_of_{num_shards:>03d}.zip")
+            for shard_num in range(num_shards)
+        ]
+        tokenize = partial(
+            _tokenize_shard, lang, dump_file, offsets, wiki2text, tokenize_options
+        )
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shard_files = list(
+                executor.map(tokenize, zip(shard_ranges, shard_files))
+            )
+        DocZip.open(output_file, lang).write_concatenated(
+            shard_files, compression=compression, compresslevel=compresslevel
+        )
+
+
+def main():
+    typer.run(decompress_wikipedia)
+
+
+def tokenize_main():
+    typer.run(tokenize_wikipedia)
+
+
+if __name__ == "__main__":
+    main()
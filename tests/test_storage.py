@@ -0,0 +1,30 @@
+import pytest
+
+from spacious_corpus.storage import DocZip
+
+
+@pytest.fixture
+def existing_zip(tmp_path):
+    path = tmp_path / "en.zip"
+    DocZip.open(path, "en").write_stream(
+        ["The first document.", "The second document."], chunk_size=1
+    )
+    return path
+
+
+def test_write_stream_unknown_compression_keeps_file(existing_zip):
+    before = existing_zip.read_bytes()
+    with pytest.raises(ValueError, match="stored, deflated, bzip2, lzma"):
+        DocZip.open(existing_zip, "en").write_stream(
+            ["Another document."], compression="zstd"
+        )
+    assert existing_zip.read_bytes() == before
+
+
+def test_write_concatenated_unknown_compression_keeps_file(existing_zip):
+    before = existing_zip.read_bytes()
+    with pytest.raises(ValueError, match="stored, deflated, bzip2, lzma"):
+        DocZip.open(existing_zip, "en").write_concatenated(
+            [existing_zip], compression="gzip"
+        )
+    assert existing_zip.read_bytes() == before